@@ -2,13 +2,13 @@ from django.contrib import admin
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
-from .models import Alerta
+from .models import Alerta, AlertaArchivada
 
 
 @admin.register(Alerta)
 class AlertaAdmin(ModelAdmin):
     list_display = ['estudiante', 'titulo', 'tipo_badge', 'estado_badge', 'leida_badge', 'fecha_creacion']
-    list_filter = ['tipo', 'activa', 'leida', 'fecha_creacion']
+    list_filter = ['tipo', 'activa', 'leida', 'automatica', 'fecha_creacion']
     search_fields = ['estudiante__codigo', 'estudiante__user__first_name', 'estudiante__user__last_name', 'titulo', 'mensaje']
     readonly_fields = ['fecha_creacion']
     date_hierarchy = 'fecha_creacion'
@@ -17,7 +17,7 @@ class AlertaAdmin(ModelAdmin):
     
     fieldsets = (
         ('Información de la Alerta', {
-            'fields': ('estudiante', 'tipo', 'titulo', 'mensaje'),
+            'fields': ('estudiante', 'materia', 'tipo', 'titulo', 'mensaje'),
             'classes': ('wide',),
         }),
         ('Estado', {
@@ -63,5 +63,23 @@ class AlertaAdmin(ModelAdmin):
         )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('estudiante', 'estudiante__user')
+        return super().get_queryset(request).select_related('estudiante', 'estudiante__user', 'materia')
 
+
+@admin.register(AlertaArchivada)
+class AlertaArchivadaAdmin(ModelAdmin):
+    """Consulta de solo lectura del archivo de alertas"""
+    list_display = ['estudiante', 'titulo', 'tipo', 'activa', 'leida', 'fecha_creacion', 'fecha_archivado']
+    list_filter = ['tipo', 'activa', 'fecha_archivado']
+    search_fields = ['estudiante__codigo', 'titulo', 'mensaje']
+    date_hierarchy = 'fecha_archivado'
+    list_per_page = 25
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('estudiante', 'estudiante__user', 'materia')
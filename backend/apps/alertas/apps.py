@@ -6,3 +6,7 @@ class AlertasConfig(AppConfig):
     name = 'apps.alertas'
     verbose_name = 'Alertas'
 
+    
+    def ready(self):
+        # Registrar las señales que invalidan los contadores de alertas
+        from . import signals  # noqa: F401
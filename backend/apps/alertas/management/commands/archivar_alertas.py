@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.alertas.models import Alerta
+from apps.alertas.utils import archivar_lote, filtro_archivables
+
+
+class Command(BaseCommand):
+    help = 'Mueve a AlertaArchivada, en lotes, las alertas vencidas o inactivas más antiguas que la retención'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.ALERTAS_DIAS_RETENCION,
+                            help=f'Días de retención (por defecto: {settings.ALERTAS_DIAS_RETENCION})')
+        parser.add_argument('--tamano-lote', type=int, default=1000,
+                            help='Cantidad de alertas por transacción (por defecto: 1000)')
+        parser.add_argument('--simular', action='store_true',
+                            help='Solo contar las alertas que se archivarían')
+    
+    def handle(self, *args, **options):
+        dias = options['dias']
+        tamano_lote = options['tamano_lote']
+        if dias < 0 or tamano_lote < 1:
+            raise CommandError('--dias no puede ser negativo y --tamano-lote debe ser mayor que 0')
+        
+        archivables = Alerta.objects.filter(filtro_archivables(dias))
+        if options['simular']:
+            self.stdout.write(f'Alertas a archivar: {archivables.count()}')
+            return
+        
+        inicio = time.monotonic()
+        total = 0
+        while True:
+            # Cada lote se borra de la tabla al archivarse: basta con tomar los primeros IDs
+            ids = list(archivables.order_by('id').values_list('id', flat=True)[:tamano_lote])
+            if not ids:
+                break
+            total += archivar_lote(ids)
+            self.stdout.write(f'  {total} alertas archivadas')
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Alertas archivadas: {total} en {time.monotonic() - inicio:.1f}s (retención: {dias} días)'
+        ))
@@ -0,0 +1,120 @@
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# Los modelos se importan dentro de las funciones: con spawn (Windows, macOS
+# y forkserver) los workers importan este módulo antes de django.setup()
+
+
+def _inicializar_worker(nombres_bd):
+    """
+    Prepara un worker del pool
+    
+    Con spawn el worker es un intérprete nuevo que debe cargar Django; con
+    fork basta con cerrar las conexiones heredadas para que abra las suyas.
+    Los nombres de las bases de datos se copian del proceso padre, que en
+    las pruebas apuntan a la base de pruebas.
+    
+    Args:
+        nombres_bd: Diccionario alias -> NAME de las bases de datos del padre
+    """
+    django.setup()
+    for alias, nombre in nombres_bd.items():
+        connections[alias].settings_dict['NAME'] = nombre
+    connections.close_all()
+
+
+def _procesar_lote(estudiante_ids):
+    """Genera las alertas de un lote de estudiantes dentro de un worker"""
+    from apps.alertas.utils import generar_alertas_automaticas_lote
+    
+    alertas = generar_alertas_automaticas_lote(estudiante_ids)
+    return len(estudiante_ids), len(alertas), estudiante_ids[-1]
+
+
+class Command(BaseCommand):
+    help = 'Genera alertas automáticas para todos los estudiantes activos usando un pool de procesos'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--tamano-lote', type=int, default=500,
+                            help='Cantidad de estudiantes por lote (por defecto: 500)')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='Cantidad de procesos (por defecto: número de CPUs)')
+        parser.add_argument('--checkpoint', default=str(Path(settings.BASE_DIR) / '.generar_alertas.checkpoint'),
+                            help='Archivo donde se guarda el progreso para reanudar')
+        parser.add_argument('--reiniciar', action='store_true',
+                            help='Ignorar el checkpoint existente y procesar desde el inicio')
+    
+    def handle(self, *args, **options):
+        from apps.estudiantes.models import Estudiante
+        
+        tamano_lote = options['tamano_lote']
+        workers = options['workers']
+        if tamano_lote < 1 or workers < 1:
+            raise CommandError('--tamano-lote y --workers deben ser mayores que 0')
+        
+        checkpoint = Path(options['checkpoint'])
+        ultimo_id = 0
+        if checkpoint.exists() and not options['reiniciar']:
+            ultimo_id = json.loads(checkpoint.read_text())['ultimo_id']
+            self.stdout.write(f'Reanudando desde el estudiante con ID > {ultimo_id}')
+        
+        ids = list(
+            Estudiante.objects.filter(activo=True, id__gt=ultimo_id)
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        lotes = [ids[i:i + tamano_lote] for i in range(0, len(ids), tamano_lote)]
+        
+        inicio = time.monotonic()
+        estudiantes_procesados = 0
+        alertas_escritas = 0
+        
+        if workers == 1:
+            resultados = map(_procesar_lote, lotes)
+            pool = None
+        else:
+            # Las conexiones del proceso padre no deben compartirse con los hijos
+            connections.close_all()
+            nombres_bd = {alias: connections[alias].settings_dict['NAME'] for alias in connections}
+            pool = multiprocessing.Pool(processes=workers, initializer=_inicializar_worker, initargs=(nombres_bd,))
+            # imap conserva el orden, de modo que el checkpoint siempre
+            # marca un prefijo de lotes completamente procesado
+            resultados = pool.imap(_procesar_lote, lotes)
+        
+        try:
+            for procesados, alertas, ultimo_id in resultados:
+                estudiantes_procesados += procesados
+                alertas_escritas += alertas
+                checkpoint.write_text(json.dumps({'ultimo_id': ultimo_id}))
+                self.stdout.write(f'  {estudiantes_procesados}/{len(ids)} estudiantes procesados')
+        except BaseException:
+            # Error o Ctrl-C: detener los workers sin esperar a los lotes
+            # pendientes, que no quedarían en el checkpoint y se repetirían
+            # al reanudar
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            raise
+        
+        if pool is not None:
+            pool.close()
+            pool.join()
+        
+        # Ejecución completa: el siguiente arranque empieza desde cero
+        checkpoint.unlink(missing_ok=True)
+        
+        duracion = time.monotonic() - inicio
+        throughput = estudiantes_procesados / duracion if duracion > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Estudiantes procesados: {estudiantes_procesados} | '
+            f'Alertas escritas: {alertas_escritas} | '
+            f'Duración: {duracion:.2f}s | '
+            f'{throughput:.1f} estudiantes/s'
+        ))
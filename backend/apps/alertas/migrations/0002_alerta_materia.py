@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alertas', '0001_initial'),
+        ('materias', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alerta',
+            name='materia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='materias.materia', verbose_name='Materia'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alertas', '0002_alerta_materia'),
+        ('estudiantes', '0003_insertar_carreras_fijas'),
+        ('materias', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alerta',
+            index=models.Index(fields=['estudiante', 'activa', 'leida', '-fecha_creacion'], name='alerta_est_act_leida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alerta',
+            index=models.Index(condition=models.Q(('activa', True), ('leida', False)), fields=['estudiante', '-fecha_creacion'], name='alerta_no_leidas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alerta',
+            index=models.Index(condition=models.Q(('fecha_vencimiento__isnull', False)), fields=['fecha_vencimiento'], name='alerta_vencimiento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alerta',
+            index=models.Index(fields=['-fecha_creacion', 'id'], name='alerta_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alertas', '0004_alerta_fecha_actualizacion'),
+        ('estudiantes', '0005_estudiante_fecha_actualizacion'),
+        ('materias', '0002_materia_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('info', 'Información'), ('warning', 'Advertencia'), ('danger', 'Peligro'), ('success', 'Éxito')], max_length=20, verbose_name='Tipo')),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('mensaje', models.TextField(verbose_name='Mensaje')),
+                ('fecha_creacion', models.DateTimeField(verbose_name='Fecha de creación')),
+                ('fecha_vencimiento', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de vencimiento')),
+                ('fecha_actualizacion', models.DateTimeField(verbose_name='Fecha de actualización')),
+                ('activa', models.BooleanField(verbose_name='Activa')),
+                ('leida', models.BooleanField(verbose_name='Leída')),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de archivado')),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas_archivadas', to='estudiantes.estudiante')),
+                ('materia', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alertas_archivadas', to='materias.materia', verbose_name='Materia')),
+            ],
+            options={
+                'verbose_name': 'Alerta archivada',
+                'verbose_name_plural': 'Alertas archivadas',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estudiante', '-fecha_creacion'], name='alerta_arch_est_fecha_idx')],
+            },
+        ),
+    ]
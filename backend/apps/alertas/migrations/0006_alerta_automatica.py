@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:32
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def marcar_automaticas(apps, schema_editor):
+    """
+    Marca como automáticas las alertas existentes que creó el generador
+    
+    Se reconocen por su título. Las alertas de riesgo anteriores a la
+    columna materia (materia nula) no se marcan: no tienen una clave
+    estable y quedan como alertas manuales.
+    """
+    Alerta = apps.get_model('alertas', 'Alerta')
+    Alerta.objects.filter(
+        Q(titulo='Asistencia baja', materia__isnull=True)
+        | Q(titulo__startswith='Riesgo alto de reprobación - ', materia__isnull=False)
+        | Q(titulo__startswith='Atención requerida - ', materia__isnull=False)
+    ).update(automatica=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alertas', '0005_alerta_archivada'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='alerta',
+            name='automatica',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Automática'),
+        ),
+        migrations.AddField(
+            model_name='alertaarchivada',
+            name='automatica',
+            field=models.BooleanField(default=False, verbose_name='Automática'),
+        ),
+        migrations.RunPython(marcar_automaticas, migrations.RunPython.noop),
+    ]
@@ -12,19 +12,73 @@ class TipoAlerta(models.TextChoices):
 class Alerta(models.Model):
     """Modelo para representar una alerta"""
     estudiante = models.ForeignKey('estudiantes.Estudiante', on_delete=models.CASCADE, related_name='alertas')
+    materia = models.ForeignKey('materias.Materia', on_delete=models.CASCADE, related_name='alertas',
+                                blank=True, null=True, verbose_name='Materia')
     tipo = models.CharField(max_length=20, choices=TipoAlerta.choices, default=TipoAlerta.INFO, verbose_name='Tipo')
     titulo = models.CharField(max_length=200, verbose_name='Título')
     mensaje = models.TextField(verbose_name='Mensaje')
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')
     fecha_vencimiento = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de vencimiento')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
     activa = models.BooleanField(default=True, verbose_name='Activa')
     leida = models.BooleanField(default=False, verbose_name='Leída')
+    # Creada por generar_alertas_automaticas; solo estas se actualizan al regenerarlas
+    automatica = models.BooleanField(default=False, editable=False, verbose_name='Automática')
     
     class Meta:
         verbose_name = 'Alerta'
         verbose_name_plural = 'Alertas'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Listado de alertas de un estudiante filtrado por estado
+            models.Index(fields=['estudiante', 'activa', 'leida', '-fecha_creacion'],
+                         name='alerta_est_act_leida_idx'),
+            # Alertas activas no leídas (contador y panel del estudiante)
+            models.Index(fields=['estudiante', '-fecha_creacion'],
+                         condition=models.Q(activa=True, leida=False),
+                         name='alerta_no_leidas_idx'),
+            # Filtro de vencimiento
+            models.Index(fields=['fecha_vencimiento'],
+                         condition=models.Q(fecha_vencimiento__isnull=False),
+                         name='alerta_vencimiento_idx'),
+            # Paginación por cursor
+            models.Index(fields=['-fecha_creacion', 'id'], name='alerta_fecha_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.estudiante.codigo} - {self.titulo} ({self.tipo})"
 
+
+class AlertaArchivada(models.Model):
+    """
+    Alerta vencida o inactiva movida fuera de la tabla de alertas
+    
+    Conserva el ID y las fechas originales; la mueve el comando
+    archivar_alertas para que la tabla de alertas solo contenga las vigentes.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    estudiante = models.ForeignKey('estudiantes.Estudiante', on_delete=models.CASCADE, related_name='alertas_archivadas')
+    materia = models.ForeignKey('materias.Materia', on_delete=models.CASCADE, related_name='alertas_archivadas',
+                                blank=True, null=True, verbose_name='Materia')
+    tipo = models.CharField(max_length=20, choices=TipoAlerta.choices, verbose_name='Tipo')
+    titulo = models.CharField(max_length=200, verbose_name='Título')
+    mensaje = models.TextField(verbose_name='Mensaje')
+    fecha_creacion = models.DateTimeField(verbose_name='Fecha de creación')
+    fecha_vencimiento = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de vencimiento')
+    fecha_actualizacion = models.DateTimeField(verbose_name='Fecha de actualización')
+    activa = models.BooleanField(verbose_name='Activa')
+    leida = models.BooleanField(verbose_name='Leída')
+    automatica = models.BooleanField(default=False, verbose_name='Automática')
+    fecha_archivado = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de archivado')
+    
+    class Meta:
+        verbose_name = 'Alerta archivada'
+        verbose_name_plural = 'Alertas archivadas'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            # Historial de alertas de un estudiante
+            models.Index(fields=['estudiante', '-fecha_creacion'], name='alerta_arch_est_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.estudiante_id} - {self.titulo} ({self.tipo})"
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Alerta
+from .utils import invalidar_contadores, publicar_alertas
+from core.cache import invalidar_grupo
+
+
+@receiver(post_save, sender=Alerta)
+@receiver(post_delete, sender=Alerta)
+def invalidar_contador_alerta(sender, instance, **kwargs):
+    """Descartar el contador en caché del estudiante y cambiar el ETag del listado de alertas"""
+    invalidar_contadores([instance.estudiante_id])
+    invalidar_grupo('alertas')
+
+
+@receiver(post_save, sender=Alerta)
+def publicar_alerta_nueva(sender, instance, created, **kwargs):
+    """Enviar la alerta nueva a los streams abiertos de su estudiante"""
+    if created:
+        publicar_alertas([instance])
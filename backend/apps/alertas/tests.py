@@ -0,0 +1,243 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.utils import timezone
+from .models import Alerta, TipoAlerta
+from .utils import generar_alertas_automaticas_lote, marca_vencimientos, obtener_contador
+from apps.estudiantes.models import Carrera, Estudiante
+from apps.materias.models import Materia
+from apps.notas.models import Nota
+from core.pagination import PaginacionEstandar
+
+
+@override_settings(CACHE_COMPARTIDA=True)
+class ListadoAlertasConsultasTests(APITestCase):
+    """El listado de alertas ejecuta las mismas consultas con cualquier tamaño de página"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        materias = [Materia.objects.create(codigo=f'MAT{i}', nombre=f'Materia {i}', creditos=3) for i in range(3)]
+        for i in range(10):
+            estudiante = Estudiante.objects.create(
+                user=User.objects.create_user(username=f'estudiante{i}'),
+                codigo=f'E{i:03}',
+                carrera=carrera,
+            )
+            for materia in materias:
+                Alerta.objects.create(estudiante=estudiante, materia=materia, tipo=TipoAlerta.WARNING,
+                                      titulo='Alerta de prueba', mensaje='Mensaje')
+    
+    def setUp(self):
+        cache.clear()
+        # La marca de vencimientos del ETag se consulta una vez y queda en caché
+        marca_vencimientos()
+    
+    def assertConsultasPorPagina(self, url, consultas):
+        for tamano in (5, 20):
+            with self.subTest(url=url, tamano=tamano), mock.patch.object(PaginacionEstandar, 'page_size', tamano):
+                with self.assertNumQueries(consultas):
+                    respuesta = self.client.get(url)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(len(respuesta.data['results']), tamano)
+    
+    def test_paginacion_por_numero(self):
+        # COUNT del paginador + página con estudiante, usuario, carrera y materia
+        self.assertConsultasPorPagina('/api/alertas/', 2)
+    
+    def test_paginacion_por_cursor(self):
+        # Solo la página: ni el ETag ni el cursor cuentan filas
+        self.assertConsultasPorPagina('/api/alertas/?paginacion=cursor', 1)
+    
+    def test_modo_compacto(self):
+        # Las relaciones incluidas salen de la misma consulta de la página
+        self.assertConsultasPorPagina('/api/alertas/?compacto=1', 2)
+
+
+@override_settings(CACHE_COMPARTIDA=True)
+class EtagListadoAlertasTests(APITestCase):
+    """El ETag del listado cambia con las escrituras masivas y con los vencimientos"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        cls.estudiante = Estudiante.objects.create(
+            user=User.objects.create_user(username='estudiante'), codigo='E000', carrera=carrera,
+        )
+        cls.alerta = Alerta.objects.create(estudiante=cls.estudiante, tipo=TipoAlerta.WARNING,
+                                           titulo='Alerta de prueba', mensaje='Mensaje')
+    
+    def setUp(self):
+        cache.clear()
+    
+    def assertNoModificada(self, etag, no_modificada=True):
+        respuesta = self.client.get('/api/alertas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304 if no_modificada else 200)
+        return respuesta['ETag']
+    
+    def test_marcar_leidas(self):
+        etag = self.client.get('/api/alertas/')['ETag']
+        self.assertNoModificada(etag)
+        
+        self.client.post('/api/alertas/marcar_leidas/', {'ids': [self.alerta.id]}, format='json')
+        self.assertNoModificada(etag, no_modificada=False)
+    
+    def test_alerta_vencida(self):
+        vencimiento = timezone.now() + timedelta(minutes=5)
+        Alerta.objects.filter(pk=self.alerta.pk).update(fecha_vencimiento=vencimiento)
+        cache.clear()
+        etag = self.client.get('/api/alertas/')['ETag']
+        self.assertNoModificada(etag)
+        
+        with mock.patch('django.utils.timezone.now', return_value=vencimiento + timedelta(seconds=1)):
+            respuesta = self.client.get('/api/alertas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['results'], [])
+
+
+class MarcarLeidasTests(APITestCase):
+    """marcar_leidas devuelve los contadores de los estudiantes cuyas alertas cambió"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        cls.estudiantes = [
+            Estudiante.objects.create(user=User.objects.create_user(username=f'estudiante{i}'),
+                                      codigo=f'E{i:03}', carrera=carrera)
+            for i in range(3)
+        ]
+        cls.alertas = [
+            Alerta.objects.create(estudiante=estudiante, tipo=TipoAlerta.WARNING, titulo='Alerta', mensaje='Mensaje')
+            for estudiante in cls.estudiantes for _ in range(2)
+        ]
+    
+    def test_solo_ids(self):
+        ids = [self.alertas[0].id, self.alertas[1].id, self.alertas[2].id]
+        respuesta = self.client.post('/api/alertas/marcar_leidas/', {'ids': ids}, format='json')
+        
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['actualizadas'], 3)
+        self.assertEqual(respuesta.data['por_estudiante'], {self.estudiantes[0].id: 0, self.estudiantes[1].id: 1})
+        self.assertEqual(respuesta.data['no_leidas'], 1)
+    
+    def test_estudiante(self):
+        estudiante = self.estudiantes[2]
+        respuesta = self.client.post('/api/alertas/marcar_leidas/', {'estudiante': estudiante.id, 'todas': True},
+                                     format='json')
+        
+        self.assertEqual(respuesta.data['actualizadas'], 2)
+        self.assertEqual(respuesta.data['por_estudiante'], {estudiante.id: 0})
+        self.assertEqual(respuesta.data['no_leidas'], 0)
+
+
+class GenerarAlertasComandoTests(TransactionTestCase):
+    """El comando generar_alertas reparte los lotes entre varios procesos"""
+    
+    def setUp(self):
+        # Se comprueba aquí y no con @skipIf: la base de pruebas aún no existe al importar el módulo
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Los workers no comparten una base SQLite en memoria')
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        materia = Materia.objects.create(codigo='MAT0', nombre='Materia 0', creditos=3)
+        for i in range(6):
+            estudiante = Estudiante.objects.create(
+                user=User.objects.create_user(username=f'estudiante{i}'), codigo=f'E{i:03}', carrera=carrera,
+            )
+            Nota.objects.create(estudiante=estudiante, materia=materia, valor=2, porcentaje=100,
+                                descripcion='Parcial')
+    
+    def test_varios_workers(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            checkpoint = Path(directorio) / 'checkpoint'
+            salida = StringIO()
+            call_command('generar_alertas', workers=2, tamano_lote=2, checkpoint=str(checkpoint), stdout=salida)
+            self.assertFalse(checkpoint.exists())
+        
+        self.assertIn('Estudiantes procesados: 6', salida.getvalue())
+        self.assertEqual(Alerta.objects.filter(automatica=True, tipo=TipoAlerta.DANGER).count(), 6)
+
+
+class GenerarAlertasAutomaticasTests(APITestCase):
+    """Las alertas automáticas siguen al riesgo calculado: cambian de tipo o se desactivan"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        cls.materia = Materia.objects.create(codigo='MAT0', nombre='Materia 0', creditos=3)
+        cls.estudiante = Estudiante.objects.create(
+            user=User.objects.create_user(username='estudiante'), codigo='E000', carrera=carrera,
+        )
+    
+    def setUp(self):
+        # Sin asistencias el riesgo es 0.3 + 0.7 * (10 - promedio) / 10
+        self.nota = Nota.objects.create(estudiante=self.estudiante, materia=self.materia, valor=2, porcentaje=100,
+                                        descripcion='Parcial')
+        self.manual = Alerta.objects.create(estudiante=self.estudiante, materia=self.materia, tipo=TipoAlerta.INFO,
+                                            titulo='Tutoría', mensaje='Mensaje')
+    
+    def cambiar_nota(self, valor):
+        self.nota.valor = valor
+        self.nota.save()
+    
+    def automaticas_activas(self):
+        return list(Alerta.objects.filter(estudiante=self.estudiante, automatica=True, activa=True))
+    
+    def test_cambio_de_tipo_actualiza_la_alerta(self):
+        generar_alertas_automaticas_lote([self.estudiante.pk])
+        [alerta] = self.automaticas_activas()
+        self.assertEqual(alerta.tipo, TipoAlerta.DANGER)
+        
+        self.cambiar_nota(7)
+        generar_alertas_automaticas_lote([self.estudiante.pk])
+        
+        [actualizada] = self.automaticas_activas()
+        self.assertEqual(actualizada.pk, alerta.pk)
+        self.assertEqual(actualizada.tipo, TipoAlerta.WARNING)
+        self.assertTrue(actualizada.titulo.startswith('Atención requerida'))
+        self.assertEqual(obtener_contador(self.estudiante.pk)['por_tipo'][TipoAlerta.DANGER]['activas'], 0)
+    
+    def test_sin_riesgo_desactiva_la_alerta(self):
+        generar_alertas_automaticas_lote([self.estudiante.pk])
+        self.assertEqual(obtener_contador(self.estudiante.pk)['activas'], 2)
+        
+        self.cambiar_nota(18)
+        generar_alertas_automaticas_lote([self.estudiante.pk])
+        
+        self.assertEqual(self.automaticas_activas(), [])
+        self.assertEqual(Alerta.objects.filter(automatica=True).count(), 1)
+        self.manual.refresh_from_db()
+        self.assertTrue(self.manual.activa)
+        self.assertEqual(obtener_contador(self.estudiante.pk)['activas'], 1)
+
+
+class StreamAlertasTests(APITestCase):
+    """El stream de alertas solo se sirve bajo ASGI y con eventos compartidos entre workers"""
+    
+    url = '/api/alertas/stream/?estudiante=1'
+    
+    def test_wsgi(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 501)
+    
+    @override_settings(EVENTOS_BACKEND='local', SERVIDOR_WORKERS=2)
+    async def test_backend_local_con_varios_workers(self):
+        respuesta = await AsyncClient().get(self.url)
+        self.assertEqual(respuesta.status_code, 501)
+    
+    @override_settings(EVENTOS_BACKEND='local', SERVIDOR_WORKERS=1)
+    async def test_asgi(self):
+        respuesta = await AsyncClient().get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Content-Type'], 'text/event-stream')
+        contenido = aiter(respuesta.streaming_content)
+        self.assertEqual(await anext(contenido), b'retry: 3000\n\n')
+        await contenido.aclose()
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AlertaViewSet
+from .views import AlertaViewSet, stream_alertas
 
 router = DefaultRouter()
 router.register(r'alertas', AlertaViewSet, basename='alerta')
 
 urlpatterns = [
+    # Antes del router para que "stream" no se interprete como un ID de alerta
+    path('alertas/stream/', stream_alertas, name='alerta-stream'),
     path('', include(router.urls)),
 ]
 
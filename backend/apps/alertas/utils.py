@@ -1,121 +1,457 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
 from django.utils import timezone
 from datetime import timedelta
-from .models import Alerta, TipoAlerta
-from apps.notas.models import Nota
-from apps.asistencias.models import Asistencia
+from .models import Alerta, AlertaArchivada, TipoAlerta
+from apps.estudiantes.models import ResumenAcademico
+from apps.materias.models import Materia
+from core.cache import invalidar_grupo, version_grupo
+from core.eventos import publicar
+from core.routers import lecturas_primaria
 import numpy as np
 
 
-def calcular_riesgo_reprobacion(estudiante, materia):
+# Umbrales del modelo de riesgo
+NOTA_MINIMA_APROBATORIA = 10  # Escala 0-20
+ASISTENCIA_MINIMA = 70  # Porcentaje
+PESO_NOTA = 0.7
+PESO_ASISTENCIA = 0.3
+
+
+def filtro_vigentes():
     """
-    Calcula el riesgo de reprobación basado en notas y asistencias
+    Condición de las alertas no vencidas
+    
+    Returns:
+        Q: Alertas sin fecha de vencimiento o con vencimiento futuro
+    """
+    return Q(fecha_vencimiento__isnull=True) | Q(fecha_vencimiento__gte=timezone.now())
+
+
+def marca_vencimientos():
+    """
+    Devuelve la fecha de vencimiento más reciente que ya pasó
+    
+    Una alerta que vence sale del listado sin que cambie la versión del
+    grupo "alertas", así que el ETag del listado incluye también este valor.
+    Se guarda en caché junto con el próximo vencimiento y solo se vuelve a
+    consultar cuando este llega o cambia alguna alerta. Se calcula con
+    lecturas de la base primaria porque la caché es compartida.
+    
+    Returns:
+        datetime: Último vencimiento alcanzado, o None si no hay ninguno
+    """
+    clave = f'alertas:vencimientos:{version_grupo("alertas")}'
+    ahora = timezone.now()
+    marca = cache.get(clave)
+    if marca is None or (marca['proximo'] is not None and marca['proximo'] < ahora):
+        with lecturas_primaria():
+            marca = {
+                'pasado': Alerta.objects.filter(fecha_vencimiento__lt=ahora)
+                .aggregate(valor=Max('fecha_vencimiento'))['valor'],
+                'proximo': Alerta.objects.filter(fecha_vencimiento__gte=ahora)
+                .aggregate(valor=Min('fecha_vencimiento'))['valor'],
+            }
+        cache.set(clave, marca)
+    return marca['pasado']
+
+
+def _clave_contador(estudiante_id):
+    return f'alertas:contador:{estudiante_id}'
+
+
+def obtener_contador(estudiante_id):
+    """
+    Devuelve los contadores de alertas activas y no leídas de un estudiante
+    
+    Se calculan con una consulta agrupada por tipo y se guardan en caché
+    hasta que cambie alguna alerta del estudiante (ver invalidar_contadores)
+    o venza la próxima de sus alertas, lo que ocurra primero.
     
     Args:
-        estudiante: Instancia de Estudiante
-        materia: Instancia de Materia
+        estudiante_id: ID del estudiante
     
     Returns:
-        float: Probabilidad de reprobación (0-1)
+        dict: no_leidas y activas totales, y por_tipo con ambos valores por TipoAlerta
+    """
+    clave = _clave_contador(estudiante_id)
+    contador = cache.get(clave)
+    if contador is not None:
+        return contador
+    
+    filas = (
+        Alerta.objects.filter(filtro_vigentes(), estudiante_id=estudiante_id, activa=True)
+        .values('tipo')
+        .annotate(activas=Count('id'), no_leidas=Count('id', filter=Q(leida=False)), vencimiento=Min('fecha_vencimiento'))
+    )
+    por_tipo = {tipo: {'no_leidas': 0, 'activas': 0} for tipo in TipoAlerta.values}
+    proximo_vencimiento = None
+    for fila in filas:
+        por_tipo[fila['tipo']] = {'no_leidas': fila['no_leidas'], 'activas': fila['activas']}
+        vencimiento = fila['vencimiento']
+        if vencimiento is not None and (proximo_vencimiento is None or vencimiento < proximo_vencimiento):
+            proximo_vencimiento = vencimiento
+    
+    contador = {
+        'no_leidas': sum(valores['no_leidas'] for valores in por_tipo.values()),
+        'activas': sum(valores['activas'] for valores in por_tipo.values()),
+        'por_tipo': por_tipo,
+    }
+    
+    # Una alerta que vence deja de contarse sin que nada la modifique
+    timeout = settings.ALERTAS_CONTADOR_SEGUNDOS
+    if proximo_vencimiento is not None:
+        timeout = max(1, min(timeout, int((proximo_vencimiento - timezone.now()).total_seconds()) + 1))
+    cache.set(clave, contador, timeout)
+    return contador
+
+
+def invalidar_contadores(estudiante_ids):
     """
-    # Obtener notas de la materia
-    notas = Nota.objects.filter(estudiante=estudiante, materia=materia)
+    Descarta los contadores en caché de los estudiantes indicados
     
-    # Obtener asistencias de la materia
-    asistencias = Asistencia.objects.filter(estudiante=estudiante, materia=materia)
+    Se llama desde las señales de Alerta y después de las operaciones
+    masivas (bulk_create, bulk_update, update) que no envían señales.
+    Se invalida de inmediato y de nuevo al confirmar la transacción.
+    """
+    claves = [_clave_contador(estudiante_id) for estudiante_id in set(estudiante_ids)]
+    if not claves:
+        return
+    cache.delete_many(claves)
+    transaction.on_commit(lambda: cache.delete_many(claves))
+
+
+def canal_alertas(estudiante_id):
+    """Canal de eventos con las alertas nuevas de un estudiante"""
+    return f'alertas:{estudiante_id}'
+
+
+def evento_alerta(alerta):
+    """Datos de una alerta tal como se envían en el stream de eventos"""
+    return {
+        'evento': 'alerta',
+        'id': alerta.id,
+        'tipo': alerta.tipo,
+        'titulo': alerta.titulo,
+        'mensaje': alerta.mensaje,
+        'materia': alerta.materia_id,
+        'fecha_creacion': alerta.fecha_creacion.isoformat(),
+    }
+
+
+def publicar_alertas(alertas):
+    """
+    Publica las alertas nuevas en el canal de su estudiante al confirmar la transacción
     
-    # Calcular promedio de notas
-    promedio_notas = 0
-    if notas.exists():
-        suma_ponderada = sum(nota.valor_ponderado for nota in notas)
-        total_porcentaje = sum(nota.porcentaje for nota in notas)
-        if total_porcentaje > 0:
-            promedio_notas = (suma_ponderada / total_porcentaje) * 100
+    Se llama desde la señal post_save de Alerta y después de bulk_create.
+    Un fallo del backend de eventos no afecta a la transacción: los clientes
+    recuperan las alertas al reconectarse con Last-Event-ID.
+    """
+    eventos = [(canal_alertas(alerta.estudiante_id), evento_alerta(alerta)) for alerta in alertas]
+    if not eventos:
+        return
     
-    # Calcular porcentaje de asistencia
-    porcentaje_asistencia = 0
-    if asistencias.exists():
-        total = asistencias.count()
-        presentes = asistencias.filter(asistio=True).count()
-        porcentaje_asistencia = (presentes / total) * 100
+    def enviar():
+        for canal, evento in eventos:
+            publicar(canal, evento)
+    transaction.on_commit(enviar, robust=True)
+
+
+def filtro_archivables(dias):
+    """
+    Condición de las alertas que pueden pasar al archivo
     
-    # Calcular riesgo basado en probabilidades
-    # Nota mínima aprobatoria: 10 (en escala 0-20)
-    riesgo_nota = max(0, (10 - promedio_notas) / 10) if promedio_notas < 10 else 0
+    Args:
+        dias: Días de retención
     
-    # Asistencia mínima: 70%
-    riesgo_asistencia = max(0, (70 - porcentaje_asistencia) / 70) if porcentaje_asistencia < 70 else 0
+    Returns:
+        Q: Alertas vencidas hace más de `dias` días, o inactivas sin
+           cambios desde hace más de `dias` días
+    """
+    limite = timezone.now() - timedelta(days=dias)
+    return Q(fecha_vencimiento__lt=limite) | Q(activa=False, fecha_actualizacion__lt=limite)
+
+
+def archivar_lote(ids):
+    """
+    Mueve un lote de alertas a AlertaArchivada dentro de una transacción
     
-    # Riesgo combinado (promedio ponderado)
-    riesgo_total = (riesgo_nota * 0.7) + (riesgo_asistencia * 0.3)
+    Args:
+        ids: IDs de las alertas a archivar
     
-    return min(1.0, max(0.0, riesgo_total))
+    Returns:
+        int: Cantidad de alertas archivadas
+    """
+    campos = [campo.attname for campo in AlertaArchivada._meta.concrete_fields if campo.name != 'fecha_archivado']
+    with transaction.atomic():
+        filas = list(Alerta.objects.filter(id__in=ids).values(*campos))
+        AlertaArchivada.objects.bulk_create([AlertaArchivada(**fila) for fila in filas], ignore_conflicts=True)
+        Alerta.objects.filter(id__in=[fila['id'] for fila in filas]).delete()
+    return len(filas)
 
 
-def generar_alertas_automaticas(estudiante):
+def _agregar_cohorte(resumenes):
     """
-    Genera alertas automáticas basadas en el rendimiento del estudiante
+    Construye las matrices de agregados de una cohorte
+    
+    Args:
+        resumenes: QuerySet de ResumenAcademico ya filtrado por la cohorte
+    
+    Returns:
+        dict: IDs de estudiantes y materias (ordenados) y matrices
+              estudiantes x materias con los agregados
+    """
+    filas = list(resumenes.values_list(
+        'estudiante_id', 'materia_id', 'suma_ponderada', 'total_porcentaje', 'total_clases', 'clases_presentes'
+    ))
+    datos = np.array(filas, dtype=np.float64).reshape(-1, 6)
+    
+    # Indexar estudiantes y materias con enteros consecutivos
+    estudiante_ids = np.unique(datos[:, 0]).astype(np.int64)
+    materia_ids = np.unique(datos[:, 1]).astype(np.int64)
+    forma = (len(estudiante_ids), len(materia_ids))
+    filas = np.searchsorted(estudiante_ids, datos[:, 0])
+    columnas = np.searchsorted(materia_ids, datos[:, 1])
+    
+    agregados = {'estudiantes': estudiante_ids, 'materias': materia_ids}
+    for posicion, nombre in enumerate(['suma_ponderada', 'total_porcentaje', 'total_clases', 'presentes'], start=2):
+        matriz = np.zeros(forma)
+        matriz[filas, columnas] = datos[:, posicion]
+        agregados[nombre] = matriz
+    return agregados
+
+
+def _riesgo_vectorizado(promedio, porcentaje_asistencia):
+    """
+    Aplica el modelo de riesgo elemento a elemento sobre arreglos numpy
+    
+    Args:
+        promedio: Arreglo de promedios (escala 0-20)
+        porcentaje_asistencia: Arreglo de porcentajes de asistencia (0-100)
+    
+    Returns:
+        numpy.ndarray: Probabilidades de reprobación (0-1)
+    """
+    riesgo_nota = np.clip((NOTA_MINIMA_APROBATORIA - promedio) / NOTA_MINIMA_APROBATORIA, 0, None)
+    riesgo_asistencia = np.clip((ASISTENCIA_MINIMA - porcentaje_asistencia) / ASISTENCIA_MINIMA, 0, None)
+    riesgo_total = (riesgo_nota * PESO_NOTA) + (riesgo_asistencia * PESO_ASISTENCIA)
+    return np.clip(riesgo_total, 0.0, 1.0)
+
+
+def calcular_matriz_riesgo(estudiantes=None, carrera=None, semestre=None, materia=None):
+    """
+    Calcula el riesgo de reprobación de toda una cohorte en una sola pasada
+    
+    Se ejecuta una sola consulta sobre los resúmenes académicos sin importar
+    el tamaño de la cohorte; el cálculo se hace con numpy.
+    
+    Args:
+        estudiantes: Lista opcional de IDs de estudiantes
+        carrera: Carrera o ID de carrera opcional
+        semestre: Semestre actual opcional de los estudiantes
+        materia: Materia o ID de materia opcional
+    
+    Returns:
+        dict: 'estudiantes' y 'materias' (IDs que indexan filas y columnas),
+              'riesgo', 'promedio' y 'asistencia' (matrices estudiantes x materias)
+              y los agregados 'total_clases' y 'presentes'. Las celdas sin
+              notas ni asistencias tienen riesgo NaN.
+    """
+    filtros = {}
+    if estudiantes is not None:
+        filtros['estudiante_id__in'] = list(estudiantes)
+    if carrera is not None:
+        filtros['estudiante__carrera_id'] = getattr(carrera, 'pk', carrera)
+    if semestre is not None:
+        filtros['estudiante__semestre_actual'] = semestre
+    if materia is not None:
+        filtros['materia_id'] = getattr(materia, 'pk', materia)
+    
+    agregados = _agregar_cohorte(ResumenAcademico.objects.filter(**filtros))
+    total_porcentaje = agregados['total_porcentaje']
+    total_clases = agregados['total_clases']
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        promedio = np.where(total_porcentaje > 0, agregados['suma_ponderada'] / total_porcentaje, 0.0)
+        asistencia = np.where(total_clases > 0, agregados['presentes'] / total_clases * 100, 0.0)
+    
+    riesgo = _riesgo_vectorizado(promedio, asistencia)
+    sin_datos = (total_porcentaje == 0) & (total_clases == 0)
+    riesgo[sin_datos] = np.nan
+    
+    agregados.update({
+        'riesgo': riesgo,
+        'promedio': promedio,
+        'asistencia': asistencia,
+    })
+    return agregados
+
+
+def calcular_riesgo_reprobacion(estudiante, materia):
+    """
+    Calcula el riesgo de reprobación basado en notas y asistencias
     
     Args:
         estudiante: Instancia de Estudiante
+        materia: Instancia de Materia
     
     Returns:
-        list: Lista de alertas generadas
+        float: Probabilidad de reprobación (0-1)
     """
-    alertas_generadas = []
+    matriz = calcular_matriz_riesgo(estudiantes=[estudiante.pk], materia=materia)
+    if matriz['riesgo'].size == 0:
+        # Sin notas ni asistencias: promedio y asistencia se consideran 0
+        return float(_riesgo_vectorizado(np.float64(0), np.float64(0)))
+    return float(matriz['riesgo'][0, 0])
+
+
+def _clase_automatica(materia_id):
+    """Clase de una alerta automática: riesgo por materia o asistencia global"""
+    return 'asistencia' if materia_id is None else 'riesgo'
+
+
+def generar_alertas_automaticas_lote(estudiante_ids):
+    """
+    Genera alertas automáticas para un grupo de estudiantes en una sola pasada
+    
+    Las alertas se insertan con bulk_create y se marcan como automáticas. Cada
+    estudiante tiene a lo sumo una alerta automática activa por clave
+    (estudiante, materia, clase), donde la clase es riesgo o asistencia: si ya
+    existe se actualizan su tipo y su texto en lugar de crear otra, y las que
+    ya no se calculan porque el riesgo desapareció se desactivan. Las alertas
+    creadas a mano no se modifican.
     
-    # Obtener todas las materias del estudiante
-    materias = set()
-    notas = Nota.objects.filter(estudiante=estudiante)
-    asistencias = Asistencia.objects.filter(estudiante=estudiante)
+    Args:
+        estudiante_ids: Lista de IDs de estudiantes
+    
+    Returns:
+        list: Alertas creadas y alertas activas existentes (actualizadas si cambiaron)
+    """
+    matriz = calcular_matriz_riesgo(estudiantes=estudiante_ids)
+    materias = Materia.objects.in_bulk(matriz['materias'].tolist())
     
-    for nota in notas:
-        materias.add(nota.materia)
-    for asistencia in asistencias:
-        materias.add(asistencia.materia)
+    # Alertas calculadas, indexadas por (estudiante_id, materia_id, clase)
+    calculadas = {}
     
-    # Generar alertas por materia
-    for materia in materias:
-        riesgo = calcular_riesgo_reprobacion(estudiante, materia)
+    riesgo = matriz['riesgo']
+    for fila, columna in zip(*np.nonzero(riesgo > 0.4)):
+        estudiante_id = int(matriz['estudiantes'][fila])
+        materia = materias[int(matriz['materias'][columna])]
+        valor = riesgo[fila, columna]
+        clave = (estudiante_id, materia.id, _clase_automatica(materia.id))
         
-        if riesgo > 0.7:
+        if valor > 0.7:
             # Riesgo alto
-            alerta = Alerta.objects.create(
-                estudiante=estudiante,
+            calculadas[clave] = Alerta(
+                estudiante_id=estudiante_id,
+                materia=materia,
                 tipo=TipoAlerta.DANGER,
                 titulo=f"Riesgo alto de reprobación - {materia.nombre}",
-                mensaje=f"Tu riesgo de reprobación en {materia.nombre} es del {riesgo*100:.1f}%. "
+                mensaje=f"Tu riesgo de reprobación en {materia.nombre} es del {valor*100:.1f}%. "
                        f"Te recomendamos revisar tus notas y asistencias.",
-                activa=True
+                activa=True,
+                automatica=True
             )
-            alertas_generadas.append(alerta)
-        elif riesgo > 0.4:
+        else:
             # Riesgo medio
-            alerta = Alerta.objects.create(
-                estudiante=estudiante,
+            calculadas[clave] = Alerta(
+                estudiante_id=estudiante_id,
+                materia=materia,
                 tipo=TipoAlerta.WARNING,
                 titulo=f"Atención requerida - {materia.nombre}",
-                mensaje=f"Tu riesgo de reprobación en {materia.nombre} es del {riesgo*100:.1f}%. "
+                mensaje=f"Tu riesgo de reprobación en {materia.nombre} es del {valor*100:.1f}%. "
                        f"Es importante mejorar tu rendimiento.",
-                activa=True
+                activa=True,
+                automatica=True
             )
-            alertas_generadas.append(alerta)
     
-    # Alerta de asistencia baja
-    if asistencias.exists():
-        total = asistencias.count()
-        presentes = asistencias.filter(asistio=True).count()
-        porcentaje_asistencia = (presentes / total) * 100
+    # Alerta de asistencia baja (sobre todas las materias del estudiante)
+    total_clases = matriz['total_clases'].sum(axis=1)
+    presentes = matriz['presentes'].sum(axis=1)
+    for fila in np.nonzero(total_clases > 0)[0]:
+        porcentaje_asistencia = (presentes[fila] / total_clases[fila]) * 100
         
-        if porcentaje_asistencia < 70:
-            alerta = Alerta.objects.create(
-                estudiante=estudiante,
+        if porcentaje_asistencia < ASISTENCIA_MINIMA:
+            estudiante_id = int(matriz['estudiantes'][fila])
+            calculadas[(estudiante_id, None, _clase_automatica(None))] = Alerta(
+                estudiante_id=estudiante_id,
                 tipo=TipoAlerta.WARNING,
                 titulo="Asistencia baja",
                 mensaje=f"Tu porcentaje de asistencia es del {porcentaje_asistencia:.1f}%. "
-                       f"Recuerda que necesitas al menos 70% para aprobar.",
-                activa=True
+                       f"Recuerda que necesitas al menos {ASISTENCIA_MINIMA}% para aprobar.",
+                activa=True,
+                automatica=True
             )
-            alertas_generadas.append(alerta)
     
-    return alertas_generadas
+    # Alertas automáticas activas de los estudiantes del lote, incluidas las
+    # que ya no se calculan
+    existentes = {}
+    obsoletas = []
+    for alerta in Alerta.objects.filter(
+        estudiante_id__in=estudiante_ids,
+        tipo__in=[TipoAlerta.DANGER, TipoAlerta.WARNING],
+        activa=True,
+        automatica=True,
+    ).order_by('id'):
+        clave = (alerta.estudiante_id, alerta.materia_id, _clase_automatica(alerta.materia_id))
+        if clave in calculadas and clave not in existentes:
+            existentes[clave] = alerta
+        else:
+            # Riesgo desaparecido o duplicado de otra alerta con la misma clave
+            obsoletas.append(alerta)
+    
+    nuevas = []
+    vigentes = []
+    actualizadas = []
+    ahora = timezone.now()
+    for clave, alerta in calculadas.items():
+        existente = existentes.get(clave)
+        if existente is None:
+            nuevas.append(alerta)
+            continue
+        # Solo se reescriben las alertas que cambiaron, para no alterar su
+        # fecha_actualizacion (y su ETag) en cada ejecución
+        if (existente.tipo, existente.titulo, existente.mensaje) != (alerta.tipo, alerta.titulo, alerta.mensaje):
+            existente.tipo = alerta.tipo
+            existente.titulo = alerta.titulo
+            existente.mensaje = alerta.mensaje
+            # bulk_update no aplica auto_now
+            existente.fecha_actualizacion = ahora
+            actualizadas.append(existente)
+        existente.materia = alerta.materia
+        vigentes.append(existente)
+    
+    for alerta in obsoletas:
+        alerta.activa = False
+        alerta.fecha_actualizacion = ahora
+    
+    with transaction.atomic():
+        Alerta.objects.bulk_create(nuevas)
+        Alerta.objects.bulk_update(actualizadas, ['tipo', 'titulo', 'mensaje', 'fecha_actualizacion'])
+        Alerta.objects.bulk_update(obsoletas, ['activa', 'fecha_actualizacion'])
+        # Las operaciones masivas no envían señales; el tipo y la desactivación
+        # cambian los contadores, el texto solo el listado
+        invalidar_contadores(alerta.estudiante_id for alerta in nuevas + actualizadas + obsoletas)
+        if nuevas or actualizadas or obsoletas:
+            invalidar_grupo('alertas')
+        publicar_alertas(nuevas)
+    
+    return nuevas + vigentes
 
+
+def generar_alertas_automaticas(estudiante):
+    """
+    Genera alertas automáticas basadas en el rendimiento del estudiante
+    
+    Args:
+        estudiante: Instancia de Estudiante
+    
+    Returns:
+        list: Lista de alertas generadas
+    """
+    alertas_generadas = generar_alertas_automaticas_lote([estudiante.pk])
+    for alerta in alertas_generadas:
+        alerta.estudiante = estudiante
+    return alertas_generadas
@@ -1,17 +1,42 @@
+import asyncio
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.db import models
+from django.views.decorators.http import require_GET
 from .models import Alerta, TipoAlerta
-from .serializers import AlertaSerializer, AlertaCreateSerializer
-from .utils import generar_alertas_automaticas
+from .serializers import AlertaSerializer, AlertaCompactaSerializer, AlertaCreateSerializer
+from .utils import (
+    canal_alertas, evento_alerta, filtro_vigentes, generar_alertas_automaticas,
+    invalidar_contadores, marca_vencimientos, obtener_contador,
+)
+from apps.estudiantes.serializers import EstudianteSerializer
+from apps.materias.serializers import MateriaListSerializer
+from core.cache import invalidar_grupo
+from core.eventos import EVENTO_DESBORDAMIENTO, formatear_sse, suscripcion
+from core.mixins import GetCondicionalMixin, RepresentacionCompactaMixin
+from core.routers import lectura_replica
+from core.utils import parsear_ids
 
 
-class AlertaViewSet(viewsets.ModelViewSet):
+class AlertaViewSet(GetCondicionalMixin, RepresentacionCompactaMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar alertas"""
     queryset = Alerta.objects.all()
     serializer_class = AlertaSerializer
+    serializer_compacto_class = AlertaCompactaSerializer
+    relaciones_compactas = (
+        ('estudiantes', 'estudiante', EstudianteSerializer),
+        ('materias', 'materia', MateriaListSerializer),
+    )
+    # Grupos de core.cache que forman parte del ETag (ver GetCondicionalMixin)
+    grupo_datos = 'alertas'
+    grupos_relacionados = ('estudiantes', 'materias', 'carreras')
+    # Ordenamiento para la paginación por cursor (?paginacion=cursor)
+    ordenamiento_cursor = ('-fecha_creacion', 'id')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -20,7 +45,8 @@ class AlertaViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filtrar alertas por estudiante y estado"""
-        queryset = Alerta.objects.all()
+        # Cargar las relaciones anidadas del serializer en la misma consulta
+        queryset = Alerta.objects.select_related('estudiante__user', 'estudiante__carrera', 'materia')
         estudiante_id = self.request.query_params.get('estudiante', None)
         activa = self.request.query_params.get('activa', None)
         leida = self.request.query_params.get('leida', None)
@@ -33,13 +59,18 @@ class AlertaViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(leida=leida.lower() == 'true')
         
         # Filtrar alertas vencidas
-        queryset = queryset.filter(
-            models.Q(fecha_vencimiento__isnull=True) | 
-            models.Q(fecha_vencimiento__gte=timezone.now())
-        )
+        queryset = queryset.filter(filtro_vigentes())
         
         return queryset
     
+    def partes_etag_listado(self):
+        # Las alertas que vencen salen del listado sin que nada las modifique
+        return (*super().partes_etag_listado(), marca_vencimientos())
+    
+    @lectura_replica
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     @action(detail=True, methods=['post'])
     def marcar_leida(self, request, pk=None):
         """Marcar una alerta como leída"""
@@ -48,6 +79,78 @@ class AlertaViewSet(viewsets.ModelViewSet):
         alerta.save()
         return Response(AlertaSerializer(alerta).data)
     
+    @action(detail=False, methods=['post'])
+    def marcar_leidas(self, request):
+        """
+        Marcar varias alertas como leídas con un solo UPDATE
+        
+        Recibe "ids" (lista de IDs) o "estudiante" con "todas": true para
+        marcar todas sus alertas activas. Si se indica "estudiante", solo se
+        modifican sus alertas. Devuelve el número de alertas sin leer de cada
+        estudiante afectado y su total.
+        """
+        estudiante_id = request.data.get('estudiante', None)
+        ids = request.data.get('ids', None)
+        todas = request.data.get('todas', False) is True
+        
+        if ids is None and not (estudiante_id and todas):
+            return Response({'error': 'Se requiere "ids" o "estudiante" con "todas": true'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        alertas = Alerta.objects.filter(activa=True, leida=False)
+        try:
+            if ids is not None:
+                alertas = alertas.filter(id__in=parsear_ids(ids))
+            if estudiante_id:
+                estudiante_id = int(estudiante_id)
+                alertas = alertas.filter(estudiante_id=estudiante_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'IDs inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # update() no envía señales: invalidar los contadores de los estudiantes afectados y el listado
+        afectados = [estudiante_id] if estudiante_id else list(alertas.values_list('estudiante_id', flat=True).distinct())
+        # update() tampoco aplica auto_now
+        actualizadas = alertas.update(leida=True, fecha_actualizacion=timezone.now())
+        invalidar_contadores(afectados)
+        invalidar_grupo('alertas')
+        
+        por_estudiante = {afectado: obtener_contador(afectado)['no_leidas'] for afectado in afectados}
+        return Response({
+            'actualizadas': actualizadas,
+            'no_leidas': sum(por_estudiante.values()),
+            'por_estudiante': por_estudiante,
+        })
+    
+    @action(detail=False, methods=['post'])
+    def archivar_vencidas(self, request):
+        """Desactivar con un solo UPDATE las alertas vencidas (opcionalmente de un estudiante)"""
+        alertas = Alerta.objects.filter(activa=True, fecha_vencimiento__lt=timezone.now())
+        estudiante_id = request.data.get('estudiante', None)
+        if estudiante_id:
+            try:
+                alertas = alertas.filter(estudiante_id=int(estudiante_id))
+            except (TypeError, ValueError):
+                return Response({'error': 'ID de estudiante inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Los contadores no cambian: las alertas vencidas ya no se cuentan
+        archivadas = alertas.update(activa=False, fecha_actualizacion=timezone.now())
+        invalidar_grupo('alertas')
+        return Response({'archivadas': archivadas})
+    
+    @action(detail=False, methods=['get'])
+    def contador(self, request):
+        """Obtener los contadores de alertas activas y no leídas de un estudiante, por tipo"""
+        estudiante_id = request.query_params.get('estudiante', None)
+        if not estudiante_id:
+            return Response({'error': 'Se requiere el parámetro estudiante'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        try:
+            estudiante_id = int(estudiante_id)
+        except ValueError:
+            return Response({'error': 'ID de estudiante inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'estudiante_id': estudiante_id, **obtener_contador(estudiante_id)})
+    
     @action(detail=False, methods=['post'])
     def generar_automaticas(self, request):
         """Generar alertas automáticas para un estudiante"""
@@ -58,7 +161,7 @@ class AlertaViewSet(viewsets.ModelViewSet):
         
         from apps.estudiantes.models import Estudiante
         try:
-            estudiante = Estudiante.objects.get(id=estudiante_id)
+            estudiante = Estudiante.objects.select_related('user', 'carrera').get(id=estudiante_id)
         except Estudiante.DoesNotExist:
             return Response({'error': 'Estudiante no encontrado'}, 
                           status=status.HTTP_404_NOT_FOUND)
@@ -71,3 +174,81 @@ class AlertaViewSet(viewsets.ModelViewSet):
             'alertas': AlertaSerializer(alertas_generadas, many=True).data
         })
 
+
+# Milisegundos que espera el navegador antes de reconectarse al stream
+REINTENTO_STREAM_MS = 3000
+
+
+async def _eventos_alertas(estudiante_id, ultimo_id):
+    async with suscripcion(canal_alertas(estudiante_id)) as sub:
+        yield f'retry: {REINTENTO_STREAM_MS}\n\n'
+        
+        # Alertas creadas mientras el cliente estaba desconectado. La
+        # suscripción ya está activa, así que no se pierde ninguna alerta
+        # creada durante esta consulta
+        if ultimo_id is not None:
+            pendientes = Alerta.objects.filter(
+                estudiante_id=estudiante_id, id__gt=ultimo_id, activa=True
+            ).order_by('id')
+            async for alerta in pendientes:
+                ultimo_id = alerta.id
+                yield formatear_sse(evento_alerta(alerta))
+        
+        while True:
+            try:
+                evento = await asyncio.wait_for(sub.cola.get(), settings.EVENTOS_KEEPALIVE_SEGUNDOS)
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene abierta la conexión en los proxies
+                yield ': keepalive\n\n'
+                continue
+            
+            if evento == EVENTO_DESBORDAMIENTO:
+                # El cliente no consumió a tiempo: cerrar para que se
+                # reconecte y recupere lo pendiente con Last-Event-ID
+                yield formatear_sse(evento)
+                return
+            # Ya enviada al recuperar las pendientes
+            if ultimo_id is not None and evento['id'] <= ultimo_id:
+                continue
+            yield formatear_sse(evento)
+
+
+@require_GET
+async def stream_alertas(request):
+    """
+    Stream Server-Sent Events con las alertas nuevas de un estudiante
+    
+    GET /api/alertas/stream/?estudiante={id}
+    
+    Sustituye al sondeo periódico de /api/alertas/. Al reconectarse, el
+    navegador envía Last-Event-ID y se reenvían las alertas activas creadas
+    desde entonces.
+    
+    Responde 501 bajo WSGI, donde cada conexión ocuparía un worker mientras
+    siga abierta, y con EVENTOS_BACKEND=local si hay varios workers, porque
+    no llegarían los eventos publicados en los demás procesos.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'El stream de alertas requiere un servidor ASGI'}, status=501)
+    if settings.EVENTOS_BACKEND == 'local' and settings.SERVIDOR_WORKERS > 1:
+        return JsonResponse({'error': 'Con varios workers el stream de alertas requiere EVENTOS_BACKEND=redis'},
+                            status=501)
+    
+    try:
+        estudiante_id = int(request.GET.get('estudiante', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Se requiere el parámetro estudiante'}, status=400)
+    
+    try:
+        ultimo_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        ultimo_id = None
+    
+    respuesta = StreamingHttpResponse(
+        _eventos_alertas(estudiante_id, ultimo_id),
+        content_type='text/event-stream',
+    )
+    respuesta['Cache-Control'] = 'no-cache'
+    # Desactivar el buffer de nginx para que los eventos lleguen al momento
+    respuesta['X-Accel-Buffering'] = 'no'
+    return respuesta
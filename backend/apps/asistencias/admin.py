@@ -1,8 +1,11 @@
 from django.contrib import admin
+from django.core.handlers.asgi import ASGIRequest
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
 from .models import Asistencia
+from .utils import COLUMNAS_EXPORTACION
+from core.exportacion import respuesta_exportacion
 
 
 @admin.register(Asistencia)
@@ -14,6 +17,8 @@ class AsistenciaAdmin(ModelAdmin):
     list_per_page = 25
     list_max_show_all = 100
     
+    actions = ['exportar_csv']
+    
     fieldsets = (
         ('Información de Asistencia', {
             'fields': ('estudiante', 'materia', 'fecha', 'asistio', 'justificada'),
@@ -43,4 +48,8 @@ class AsistenciaAdmin(ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('estudiante', 'estudiante__user', 'materia')
-
+    
+    @admin.action(description='Exportar seleccionadas a CSV')
+    def exportar_csv(self, request, queryset):
+        return respuesta_exportacion(queryset.order_by('-fecha', 'materia_id', 'id'), COLUMNAS_EXPORTACION, 'csv', 'asistencias',
+                                     asincrona=isinstance(request, ASGIRequest))
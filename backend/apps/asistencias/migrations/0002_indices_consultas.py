@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0001_initial'),
+        ('estudiantes', '0003_insertar_carreras_fijas'),
+        ('materias', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['estudiante', 'materia', 'asistio'], name='asist_est_mat_asistio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['materia', 'asistio'], name='asist_mat_asistio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['-fecha', 'materia', 'id'], name='asist_fecha_mat_id_idx'),
+        ),
+    ]
@@ -9,12 +9,21 @@ class Asistencia(models.Model):
     asistio = models.BooleanField(default=True, verbose_name='Asistió')
     justificada = models.BooleanField(default=False, verbose_name='Justificada')
     observaciones = models.TextField(blank=True, null=True, verbose_name='Observaciones')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
     
     class Meta:
         verbose_name = 'Asistencia'
         verbose_name_plural = 'Asistencias'
         ordering = ['-fecha', 'materia']
         unique_together = ['estudiante', 'materia', 'fecha']
+        indexes = [
+            # Estadísticas por estudiante y materia (conteo de presentes)
+            models.Index(fields=['estudiante', 'materia', 'asistio'], name='asist_est_mat_asistio_idx'),
+            # Estadísticas por materia
+            models.Index(fields=['materia', 'asistio'], name='asist_mat_asistio_idx'),
+            # Paginación por cursor
+            models.Index(fields=['-fecha', 'materia', 'id'], name='asist_fecha_mat_id_idx'),
+        ]
     
     def __str__(self):
         estado = "Presente" if self.asistio else "Ausente"
@@ -15,9 +15,31 @@ class AsistenciaSerializer(serializers.ModelSerializer):
                   'justificada', 'observaciones']
 
 
+class AsistenciaCompactaSerializer(serializers.ModelSerializer):
+    """Serializer de Asistencia con solo los IDs de estudiante y materia"""
+    class Meta:
+        model = Asistencia
+        fields = ['id', 'estudiante', 'materia', 'fecha', 'asistio', 
+                  'justificada', 'observaciones']
+        read_only_fields = fields
+
+
 class AsistenciaCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear una asistencia"""
     class Meta:
         model = Asistencia
         fields = ['estudiante', 'materia', 'fecha', 'asistio', 'justificada', 'observaciones']
 
+
+class AsistenciaImportSerializer(AsistenciaCreateSerializer):
+    """
+    Serializer para validar una fila de la importación masiva
+    
+    Las relaciones se reciben como IDs y la restricción única no se valida
+    aquí: ambas se resuelven por lote al escribir.
+    """
+    estudiante = serializers.IntegerField()
+    materia = serializers.IntegerField()
+    
+    class Meta(AsistenciaCreateSerializer.Meta):
+        validators = []
@@ -0,0 +1,86 @@
+from datetime import date
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from .models import Asistencia
+from apps.estudiantes.models import Carrera, Estudiante, ResumenAcademico
+from apps.materias.models import Materia
+from core.pagination import PaginacionEstandar
+
+
+@override_settings(CACHE_COMPARTIDA=True)
+class ListadoAsistenciasConsultasTests(APITestCase):
+    """El listado de asistencias ejecuta las mismas consultas con cualquier tamaño de página"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        materias = [Materia.objects.create(codigo=f'MAT{i}', nombre=f'Materia {i}', creditos=3) for i in range(3)]
+        for i in range(10):
+            estudiante = Estudiante.objects.create(
+                user=User.objects.create_user(username=f'estudiante{i}'),
+                codigo=f'E{i:03}',
+                carrera=carrera,
+            )
+            for materia in materias:
+                Asistencia.objects.create(estudiante=estudiante, materia=materia, fecha=date(2025, 3, 1))
+    
+    def setUp(self):
+        cache.clear()
+    
+    def assertConsultasPorPagina(self, url, consultas):
+        for tamano in (5, 20):
+            with self.subTest(url=url, tamano=tamano), mock.patch.object(PaginacionEstandar, 'page_size', tamano):
+                with self.assertNumQueries(consultas):
+                    respuesta = self.client.get(url)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(len(respuesta.data['results']), tamano)
+    
+    def test_paginacion_por_numero(self):
+        # COUNT del paginador + página con estudiante, usuario, carrera y materia
+        self.assertConsultasPorPagina('/api/asistencias/', 2)
+    
+    def test_paginacion_por_cursor(self):
+        # Solo la página: ni el ETag ni el cursor cuentan filas
+        self.assertConsultasPorPagina('/api/asistencias/?paginacion=cursor', 1)
+    
+    def test_modo_compacto(self):
+        # Las relaciones incluidas salen de la misma consulta de la página
+        self.assertConsultasPorPagina('/api/asistencias/?compacto=1', 2)
+
+
+class ImportarAsistenciasTests(APITestCase):
+    """Importación de asistencias en lote desde CSV"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        cls.materia = Materia.objects.create(codigo='MAT0', nombre='Materia 0', creditos=3)
+        cls.estudiante = Estudiante.objects.create(user=User.objects.create_user(username='estudiante'),
+                                                   codigo='E000', carrera=carrera)
+    
+    def importar(self, filas):
+        lineas = ['estudiante,materia,fecha,asistio'] + [','.join(str(valor) for valor in fila) for fila in filas]
+        return self.client.post('/api/asistencias/importar/', '\n'.join(lineas), content_type='text/csv')
+    
+    def test_importar_y_actualizar(self):
+        estudiante, materia = self.estudiante.id, self.materia.id
+        respuesta = self.importar([
+            (estudiante, materia, '2025-03-01', 'true'),
+            (estudiante, materia, '2025-03-02', 'false'),
+            # La última fila con la misma clave reemplaza a la anterior
+            (estudiante, materia, '2025-03-02', 'true'),
+            (estudiante, materia, 'no-es-fecha', 'true'),
+        ])
+        
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([error['fila'] for error in respuesta.data['errores']], [5])
+        self.assertEqual(Asistencia.objects.count(), 2)
+        
+        self.importar([(estudiante, materia, '2025-03-01', 'false')])
+        self.assertEqual(Asistencia.objects.count(), 2)
+        resumen = ResumenAcademico.objects.get(estudiante=self.estudiante, materia=self.materia)
+        self.assertEqual((resumen.total_clases, resumen.clases_presentes), (2, 1))
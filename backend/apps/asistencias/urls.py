@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AsistenciaViewSet
+from .views import AsistenciaViewSet, estadisticas_estudiante_async, estadisticas_materia_async
 
 router = DefaultRouter()
 router.register(r'asistencias', AsistenciaViewSet, basename='asistencia')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # Variantes asíncronas (requieren un servidor ASGI para ser útiles)
+    path('async/asistencias/estadisticas_estudiante/', estadisticas_estudiante_async, name='asistencia-estadisticas-estudiante-async'),
+    path('async/asistencias/estadisticas_materia/', estadisticas_materia_async, name='asistencia-estadisticas-materia-async'),
 ]
 
@@ -0,0 +1,51 @@
+from django.db.models import Count, Q
+
+# Columnas de la exportación (encabezado, campo); coinciden con las de la importación
+COLUMNAS_EXPORTACION = (
+    ('id', 'id'),
+    ('estudiante', 'estudiante_id'),
+    ('estudiante_codigo', 'estudiante__codigo'),
+    ('materia', 'materia_id'),
+    ('materia_codigo', 'materia__codigo'),
+    ('fecha', 'fecha'),
+    ('asistio', 'asistio'),
+    ('justificada', 'justificada'),
+    ('observaciones', 'observaciones'),
+)
+
+
+def agregados_asistencia():
+    """
+    Expresiones de agregación condicional para las estadísticas de asistencia
+    
+    Returns:
+        dict: total de clases, presentes y ausencias justificadas
+    """
+    return {
+        'total': Count('id'),
+        'presentes': Count('id', filter=Q(asistio=True)),
+        'justificadas': Count('id', filter=Q(asistio=False, justificada=True)),
+    }
+
+
+def resumen_asistencia(agregados):
+    """
+    Construye las estadísticas de asistencia a partir de los agregados
+    
+    Args:
+        agregados: dict con total, presentes y justificadas
+    
+    Returns:
+        dict: porcentaje de asistencia, total de clases, presentes,
+              ausentes y ausencias justificadas
+    """
+    total = agregados['total']
+    presentes = agregados['presentes']
+    porcentaje = (presentes / total) * 100 if total else 0
+    return {
+        'porcentaje_asistencia': round(porcentaje, 2),
+        'total_clases': total,
+        'presentes': presentes,
+        'ausentes': total - presentes,
+        'justificadas': agregados['justificadas'],
+    }
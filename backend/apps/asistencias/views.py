@@ -1,15 +1,46 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models.functions import TruncWeek
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from .models import Asistencia
-from .serializers import AsistenciaSerializer, AsistenciaCreateSerializer
+from .serializers import AsistenciaSerializer, AsistenciaCompactaSerializer, AsistenciaCreateSerializer, AsistenciaImportSerializer
+from .utils import COLUMNAS_EXPORTACION, agregados_asistencia, resumen_asistencia
+from apps.estudiantes.models import Estudiante
+from apps.estudiantes.serializers import EstudianteSerializer
+from apps.estudiantes.utils import reconstruir_resumenes
+from apps.materias.models import Materia
+from apps.materias.serializers import MateriaListSerializer
+from core.cache import invalidar_grupo
+from core.exportacion import filtrar_fechas, respuesta_exportacion
+from core.importacion import importar_filas, leer_filas
+from core.mixins import GetCondicionalMixin, RepresentacionCompactaMixin
+from core.routers import lectura_replica
+from core.utils import parsear_ids
 
 
-class AsistenciaViewSet(viewsets.ModelViewSet):
+def _despues_de_importar(objetos):
+    """bulk_create no envía señales: actualizar los resúmenes y el ETag de los listados"""
+    reconstruir_resumenes({objeto.estudiante_id for objeto in objetos})
+    invalidar_grupo('asistencias')
+
+
+class AsistenciaViewSet(GetCondicionalMixin, RepresentacionCompactaMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar asistencias"""
     queryset = Asistencia.objects.all()
     serializer_class = AsistenciaSerializer
+    serializer_compacto_class = AsistenciaCompactaSerializer
+    relaciones_compactas = (
+        ('estudiantes', 'estudiante', EstudianteSerializer),
+        ('materias', 'materia', MateriaListSerializer),
+    )
+    # Grupos de core.cache que forman parte del ETag (ver GetCondicionalMixin)
+    grupo_datos = 'asistencias'
+    grupos_relacionados = ('estudiantes', 'materias', 'carreras')
+    # Ordenamiento para la paginación por cursor (?paginacion=cursor)
+    ordenamiento_cursor = ('-fecha', 'materia_id', 'id')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -18,7 +49,8 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filtrar asistencias por estudiante o materia si se proporciona"""
-        queryset = Asistencia.objects.all()
+        # Cargar las relaciones anidadas del serializer en la misma consulta
+        queryset = Asistencia.objects.select_related('estudiante__user', 'estudiante__carrera', 'materia')
         estudiante_id = self.request.query_params.get('estudiante', None)
         materia_id = self.request.query_params.get('materia', None)
         
@@ -30,6 +62,7 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'])
+    @lectura_replica
     def estadisticas_estudiante(self, request):
         """Obtener estadísticas de asistencia de un estudiante"""
         estudiante_id = request.query_params.get('estudiante', None)
@@ -37,31 +70,15 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Se requiere el parámetro estudiante'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        asistencias = Asistencia.objects.filter(estudiante_id=estudiante_id)
-        
-        if not asistencias.exists():
-            return Response({
-                'estudiante_id': estudiante_id,
-                'porcentaje_asistencia': 0,
-                'total_clases': 0,
-                'presentes': 0,
-                'ausentes': 0
-            })
-        
-        total = asistencias.count()
-        presentes = asistencias.filter(asistio=True).count()
-        ausentes = total - presentes
-        porcentaje = (presentes / total) * 100
+        agregados = Asistencia.objects.filter(estudiante_id=estudiante_id).aggregate(**agregados_asistencia())
         
         return Response({
             'estudiante_id': estudiante_id,
-            'porcentaje_asistencia': round(porcentaje, 2),
-            'total_clases': total,
-            'presentes': presentes,
-            'ausentes': ausentes
+            **resumen_asistencia(agregados)
         })
     
     @action(detail=False, methods=['get'])
+    @lectura_replica
     def estadisticas_materia(self, request):
         """Obtener estadísticas de asistencia de una materia"""
         materia_id = request.query_params.get('materia', None)
@@ -69,27 +86,126 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Se requiere el parámetro materia'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        asistencias = Asistencia.objects.filter(materia_id=materia_id)
-        
-        if not asistencias.exists():
-            return Response({
-                'materia_id': materia_id,
-                'porcentaje_asistencia': 0,
-                'total_clases': 0,
-                'presentes': 0,
-                'ausentes': 0
-            })
-        
-        total = asistencias.count()
-        presentes = asistencias.filter(asistio=True).count()
-        ausentes = total - presentes
-        porcentaje = (presentes / total) * 100
+        agregados = Asistencia.objects.filter(materia_id=materia_id).aggregate(**agregados_asistencia())
         
         return Response({
             'materia_id': materia_id,
-            'porcentaje_asistencia': round(porcentaje, 2),
-            'total_clases': total,
-            'presentes': presentes,
-            'ausentes': ausentes
+            **resumen_asistencia(agregados)
         })
+    
+    @action(detail=False, methods=['get'])
+    @lectura_replica
+    def estadisticas_agrupadas(self, request):
+        """
+        Obtener estadísticas de asistencia agrupadas por estudiante, materia
+        y/o semana en una sola consulta
+        
+        Parámetros: estudiante y/o materia (IDs separados por comas) y
+        agrupar (por defecto "materia"; admite "estudiante,materia,semana")
+        """
+        try:
+            estudiante_ids = parsear_ids(request.query_params.get('estudiante', ''))
+            materia_ids = parsear_ids(request.query_params.get('materia', ''))
+        except ValueError:
+            return Response({'error': 'Los parámetros estudiante y materia deben ser IDs separados por comas'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        if not estudiante_ids and not materia_ids:
+            return Response({'error': 'Se requiere el parámetro estudiante o materia'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        agrupar = [campo.strip() for campo in request.query_params.get('agrupar', 'materia').split(',') if campo.strip()]
+        columnas = {'estudiante': 'estudiante_id', 'materia': 'materia_id', 'semana': 'semana'}
+        if not agrupar or any(campo not in columnas for campo in agrupar):
+            return Response({'error': 'agrupar solo admite: estudiante, materia, semana'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        claves = [columnas[campo] for campo in dict.fromkeys(agrupar)]
+        
+        asistencias = Asistencia.objects.order_by()
+        if estudiante_ids:
+            asistencias = asistencias.filter(estudiante_id__in=estudiante_ids)
+        if materia_ids:
+            asistencias = asistencias.filter(materia_id__in=materia_ids)
+        if 'semana' in claves:
+            asistencias = asistencias.annotate(semana=TruncWeek('fecha'))
+        
+        filas = asistencias.values(*claves).annotate(**agregados_asistencia()).order_by(*claves)
+        
+        return Response([
+            {**{clave: fila[clave] for clave in claves}, **resumen_asistencia(fila)}
+            for fila in filas
+        ])
+    
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        """
+        Importar asistencias en lote desde CSV (text/csv) o JSON lines (application/x-ndjson)
+        
+        Las filas que ya existen se actualizan. Devuelve un reporte con los
+        errores de validación por fila.
+        """
+        reporte = importar_filas(
+            leer_filas(request),
+            AsistenciaImportSerializer,
+            Asistencia,
+            relaciones={'estudiante': Estudiante, 'materia': Materia},
+            unique_fields=['estudiante', 'materia', 'fecha'],
+            update_fields=['asistio', 'justificada', 'observaciones', 'fecha_actualizacion'],
+            al_escribir=_despues_de_importar,
+        )
+        return Response(reporte)
+    
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exportar asistencias en CSV o JSON lines (?formato=csv|jsonl)
+        
+        Acepta los filtros del listado (estudiante, materia) y el rango de
+        fechas desde/hasta. Las filas se envían por partes, sin cargar la
+        consulta completa en memoria.
+        """
+        try:
+            queryset = filtrar_fechas(self.get_queryset(), request.query_params)
+            return respuesta_exportacion(
+                queryset.order_by(*self.ordenamiento_cursor),
+                COLUMNAS_EXPORTACION,
+                request.query_params.get('formato', 'csv'),
+                'asistencias',
+                asincrona=isinstance(request._request, ASGIRequest),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 
+# Variantes asíncronas para servidores ASGI (/api/async/...), con la misma
+# respuesta que las acciones del ViewSet
+
+@require_GET
+@lectura_replica
+async def estadisticas_estudiante_async(request):
+    """Obtener estadísticas de asistencia de un estudiante (versión asíncrona)"""
+    estudiante_id = request.GET.get('estudiante', None)
+    if not estudiante_id:
+        return JsonResponse({'error': 'Se requiere el parámetro estudiante'}, status=400)
+    
+    agregados = await Asistencia.objects.filter(estudiante_id=estudiante_id).aaggregate(**agregados_asistencia())
+    
+    return JsonResponse({
+        'estudiante_id': estudiante_id,
+        **resumen_asistencia(agregados)
+    })
+
+
+@require_GET
+@lectura_replica
+async def estadisticas_materia_async(request):
+    """Obtener estadísticas de asistencia de una materia (versión asíncrona)"""
+    materia_id = request.GET.get('materia', None)
+    if not materia_id:
+        return JsonResponse({'error': 'Se requiere el parámetro materia'}, status=400)
+    
+    agregados = await Asistencia.objects.filter(materia_id=materia_id).aaggregate(**agregados_asistencia())
+    
+    return JsonResponse({
+        'materia_id': materia_id,
+        **resumen_asistencia(agregados)
+    })
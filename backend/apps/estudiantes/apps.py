@@ -5,4 +5,7 @@ class EstudiantesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.estudiantes'
     verbose_name = 'Estudiantes'  # Nombre que se mostrará en el admin
-
+    
+    def ready(self):
+        # Registrar las señales que mantienen el resumen académico
+        from . import signals  # noqa: F401
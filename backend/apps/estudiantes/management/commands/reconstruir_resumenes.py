@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.estudiantes.utils import reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los resúmenes académicos desde las notas y asistencias'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiante', type=int, action='append', dest='estudiantes',
+                            help='ID de estudiante a reconstruir (se puede repetir; por defecto, todos)')
+    
+    def handle(self, *args, **options):
+        total = reconstruir_resumenes(options['estudiantes'])
+        self.stdout.write(self.style.SUCCESS(f'Resúmenes académicos reconstruidos: {total}'))
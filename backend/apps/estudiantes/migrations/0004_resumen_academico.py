@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def poblar_resumenes(apps, schema_editor):
+    """Calcula los resúmenes académicos a partir de las notas y asistencias existentes"""
+    ResumenAcademico = apps.get_model('estudiantes', 'ResumenAcademico')
+    Nota = apps.get_model('notas', 'Nota')
+    Asistencia = apps.get_model('asistencias', 'Asistencia')
+    
+    resumenes = {}
+    notas = Nota.objects.order_by().values('estudiante_id', 'materia_id').annotate(
+        suma_ponderada=Sum(F('valor') * F('porcentaje')),
+        total_porcentaje=Sum('porcentaje'),
+        total_notas=Count('id'),
+    )
+    for fila in notas:
+        resumenes[(fila['estudiante_id'], fila['materia_id'])] = ResumenAcademico(
+            estudiante_id=fila['estudiante_id'],
+            materia_id=fila['materia_id'],
+            suma_ponderada=fila['suma_ponderada'],
+            total_porcentaje=fila['total_porcentaje'],
+            total_notas=fila['total_notas'],
+        )
+    
+    asistencias = Asistencia.objects.order_by().values('estudiante_id', 'materia_id').annotate(
+        total_clases=Count('id'),
+        clases_presentes=Count('id', filter=Q(asistio=True)),
+    )
+    for fila in asistencias:
+        resumen = resumenes.setdefault(
+            (fila['estudiante_id'], fila['materia_id']),
+            ResumenAcademico(estudiante_id=fila['estudiante_id'], materia_id=fila['materia_id']),
+        )
+        resumen.total_clases = fila['total_clases']
+        resumen.clases_presentes = fila['clases_presentes']
+    
+    ResumenAcademico.objects.bulk_create(resumenes.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estudiantes', '0003_insertar_carreras_fijas'),
+        ('materias', '0001_initial'),
+        ('notas', '0002_indices_consultas'),
+        ('asistencias', '0002_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAcademico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('suma_ponderada', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Suma de valor × porcentaje')),
+                ('total_porcentaje', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Suma de porcentajes')),
+                ('total_notas', models.IntegerField(default=0, verbose_name='Total de notas')),
+                ('total_clases', models.IntegerField(default=0, verbose_name='Total de clases')),
+                ('clases_presentes', models.IntegerField(default=0, verbose_name='Clases con asistencia')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='estudiantes.estudiante')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='materias.materia')),
+            ],
+            options={
+                'verbose_name': 'Resumen académico',
+                'verbose_name_plural': 'Resúmenes académicos',
+                'unique_together': {('estudiante', 'materia')},
+            },
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
@@ -46,6 +46,7 @@ class Estudiante(models.Model):
                                 verbose_name='Carrera')
     semestre_actual = models.IntegerField(default=1, verbose_name='Semestre actual')
     fecha_ingreso = models.DateField(auto_now_add=True, verbose_name='Fecha de ingreso')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
     activo = models.BooleanField(default=True, verbose_name='Activo')
     
     class Meta:
@@ -63,3 +64,31 @@ class Estudiante(models.Model):
     @property
     def email(self):
         return self.user.email
+
+
+class ResumenAcademico(models.Model):
+    """
+    Acumulados de notas y asistencias por estudiante y materia
+    
+    Se mantiene de forma incremental con las señales de Nota y Asistencia
+    (ver apps.estudiantes.signals) y se puede reconstruir con
+    `python manage.py reconstruir_resumenes`.
+    """
+    estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE, related_name='resumenes')
+    materia = models.ForeignKey('materias.Materia', on_delete=models.CASCADE, related_name='resumenes')
+    suma_ponderada = models.DecimalField(max_digits=14, decimal_places=4, default=0,
+                                         verbose_name='Suma de valor × porcentaje')
+    total_porcentaje = models.DecimalField(max_digits=10, decimal_places=2, default=0,
+                                           verbose_name='Suma de porcentajes')
+    total_notas = models.IntegerField(default=0, verbose_name='Total de notas')
+    total_clases = models.IntegerField(default=0, verbose_name='Total de clases')
+    clases_presentes = models.IntegerField(default=0, verbose_name='Clases con asistencia')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
+    
+    class Meta:
+        verbose_name = 'Resumen académico'
+        verbose_name_plural = 'Resúmenes académicos'
+        unique_together = ['estudiante', 'materia']
+    
+    def __str__(self):
+        return f"{self.estudiante_id} - {self.materia_id}"
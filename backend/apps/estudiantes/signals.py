@@ -0,0 +1,93 @@
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.notas.models import Nota
+from apps.asistencias.models import Asistencia
+from .models import Carrera, Estudiante
+from .utils import acumular_asistencia, acumular_nota
+from core.authentication import invalidar_token
+from core.cache import invalidar_grupo
+
+
+@receiver(pre_save, sender=Nota)
+@receiver(pre_save, sender=Asistencia)
+def guardar_estado_anterior(sender, instance, **kwargs):
+    """Guardar los valores previos para poder restarlos del resumen al actualizar"""
+    instance._resumen_anterior = None
+    if instance.pk:
+        instance._resumen_anterior = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Nota)
+def actualizar_resumen_nota(sender, instance, **kwargs):
+    """Actualizar el resumen académico al crear o modificar una nota"""
+    anterior = getattr(instance, '_resumen_anterior', None)
+    if anterior is not None:
+        acumular_nota(anterior, signo=-1, crear=False)
+    acumular_nota(instance)
+
+
+@receiver(post_save, sender=Asistencia)
+def actualizar_resumen_asistencia(sender, instance, **kwargs):
+    """Actualizar el resumen académico al crear o modificar una asistencia"""
+    anterior = getattr(instance, '_resumen_anterior', None)
+    if anterior is not None:
+        acumular_asistencia(anterior, signo=-1, crear=False)
+    acumular_asistencia(instance)
+
+
+@receiver(post_delete, sender=Nota)
+def descontar_resumen_nota(sender, instance, **kwargs):
+    """Restar la nota eliminada del resumen académico"""
+    acumular_nota(instance, signo=-1, crear=False)
+
+
+@receiver(post_delete, sender=Asistencia)
+def descontar_resumen_asistencia(sender, instance, **kwargs):
+    """Restar la asistencia eliminada del resumen académico"""
+    acumular_asistencia(instance, signo=-1, crear=False)
+
+
+@receiver(post_save, sender=Nota)
+@receiver(post_delete, sender=Nota)
+def invalidar_cache_notas(sender, **kwargs):
+    """Cambiar el ETag del listado de notas"""
+    invalidar_grupo('notas')
+
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_delete, sender=Asistencia)
+def invalidar_cache_asistencias(sender, **kwargs):
+    """Cambiar el ETag del listado de asistencias"""
+    invalidar_grupo('asistencias')
+
+
+@receiver(post_save, sender=Carrera)
+@receiver(post_delete, sender=Carrera)
+def invalidar_cache_carreras(sender, **kwargs):
+    """Descartar las respuestas de carreras en caché al modificarlas"""
+    invalidar_grupo('carreras')
+
+
+@receiver(post_save, sender=Estudiante)
+@receiver(post_delete, sender=Estudiante)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_cache_estudiantes(sender, **kwargs):
+    """Cambiar el ETag de los listados que anidan estudiantes o usuarios"""
+    invalidar_grupo('estudiantes')
+
+
+@receiver(post_delete, sender=Token)
+def invalidar_token_eliminado(sender, instance, **kwargs):
+    """Descartar de la caché de autenticación un token eliminado (logout)"""
+    invalidar_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidar_tokens_usuario(sender, instance, created, **kwargs):
+    """Descartar los tokens en caché de un usuario modificado (por ejemplo, desactivado)"""
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            invalidar_token(key)
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     EstudianteViewSet, 
     CarreraViewSet,
+    estadisticas_async,
     login_view,
     registro_view,
     perfil_view,
@@ -19,5 +20,7 @@ urlpatterns = [
     path('auth/registro/', registro_view, name='registro'),
     path('auth/perfil/', perfil_view, name='perfil'),
     path('auth/logout/', logout_view, name='logout'),
+    # Variante asíncrona (requiere un servidor ASGI para ser útil)
+    path('async/estudiantes/<int:pk>/estadisticas/', estadisticas_async, name='estudiante-estadisticas-async'),
 ]
 
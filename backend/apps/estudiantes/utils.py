@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import ResumenAcademico
+from apps.notas.models import Nota
+from apps.notas.utils import agregados_promedio
+from apps.asistencias.models import Asistencia
+from apps.asistencias.utils import agregados_asistencia
+
+
+def agregados_resumen():
+    """
+    Expresiones de agregación sobre ResumenAcademico
+    
+    Returns:
+        dict: Sumas de los acumulados de notas y asistencias
+    """
+    return {
+        'suma_ponderada': Sum('suma_ponderada'),
+        'total_porcentaje': Sum('total_porcentaje'),
+        'total_notas': Sum('total_notas'),
+        'total_clases': Sum('total_clases'),
+        'clases_presentes': Sum('clases_presentes'),
+    }
+
+
+def acumular_resumen(estudiante_id, materia_id, crear=True, **incrementos):
+    """
+    Suma incrementos a los acumulados de un par (estudiante, materia)
+    
+    Args:
+        estudiante_id: ID del estudiante
+        materia_id: ID de la materia
+        crear: Si es False y el resumen no existe, no se crea (al restar)
+        **incrementos: Valores a sumar a cada campo acumulado
+    """
+    cambios = {campo: F(campo) + valor for campo, valor in incrementos.items()}
+    # update() no aplica auto_now
+    cambios['fecha_actualizacion'] = timezone.now()
+    resumenes = ResumenAcademico.objects.filter(estudiante_id=estudiante_id, materia_id=materia_id)
+    if resumenes.update(**cambios) or not crear:
+        return
+    try:
+        with transaction.atomic():
+            ResumenAcademico.objects.create(estudiante_id=estudiante_id, materia_id=materia_id, **incrementos)
+    except IntegrityError:
+        # Otro proceso lo creó al mismo tiempo
+        resumenes.update(**cambios)
+
+
+def acumular_nota(nota, signo=1, crear=True):
+    """Suma (signo=1) o resta (signo=-1) una nota de los acumulados"""
+    valor = Decimal(str(nota.valor))
+    porcentaje = Decimal(str(nota.porcentaje))
+    acumular_resumen(
+        nota.estudiante_id, nota.materia_id, crear=crear,
+        suma_ponderada=signo * valor * porcentaje,
+        total_porcentaje=signo * porcentaje,
+        total_notas=signo,
+    )
+
+
+def acumular_asistencia(asistencia, signo=1, crear=True):
+    """Suma (signo=1) o resta (signo=-1) una asistencia de los acumulados"""
+    acumular_resumen(
+        asistencia.estudiante_id, asistencia.materia_id, crear=crear,
+        total_clases=signo,
+        clases_presentes=signo if asistencia.asistio else 0,
+    )
+
+
+@transaction.atomic
+def reconstruir_resumenes(estudiante_ids=None):
+    """
+    Reconstruye los resúmenes académicos desde las notas y asistencias
+    
+    Args:
+        estudiante_ids: Lista opcional de IDs de estudiantes (por defecto, todos)
+    
+    Returns:
+        int: Cantidad de resúmenes creados
+    """
+    resumenes = ResumenAcademico.objects.all()
+    notas = Nota.objects.order_by()
+    asistencias = Asistencia.objects.order_by()
+    if estudiante_ids is not None:
+        estudiante_ids = list(estudiante_ids)
+        resumenes = resumenes.filter(estudiante_id__in=estudiante_ids)
+        notas = notas.filter(estudiante_id__in=estudiante_ids)
+        asistencias = asistencias.filter(estudiante_id__in=estudiante_ids)
+    
+    nuevos = {}
+    for fila in notas.values('estudiante_id', 'materia_id').annotate(**agregados_promedio()):
+        nuevos[(fila['estudiante_id'], fila['materia_id'])] = ResumenAcademico(
+            estudiante_id=fila['estudiante_id'],
+            materia_id=fila['materia_id'],
+            suma_ponderada=fila['suma_ponderada'],
+            total_porcentaje=fila['total_porcentaje'],
+            total_notas=fila['total_notas'],
+        )
+    for fila in asistencias.values('estudiante_id', 'materia_id').annotate(**agregados_asistencia()):
+        resumen = nuevos.setdefault(
+            (fila['estudiante_id'], fila['materia_id']),
+            ResumenAcademico(estudiante_id=fila['estudiante_id'], materia_id=fila['materia_id']),
+        )
+        resumen.total_clases = fila['total']
+        resumen.clases_presentes = fila['presentes']
+    
+    resumenes.delete()
+    ResumenAcademico.objects.bulk_create(nuevos.values(), batch_size=1000)
+    return len(nuevos)
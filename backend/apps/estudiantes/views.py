@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
@@ -5,54 +6,64 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from .models import Estudiante, Carrera
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from .models import Estudiante, Carrera, ResumenAcademico
 from .serializers import EstudianteSerializer, EstudianteCreateSerializer, UserSerializer, CarreraSerializer
+from .utils import agregados_resumen
+from apps.notas.utils import calcular_promedio
+from core.authentication import token_expirado
+from core.cache import cachear_respuesta
+from core.mixins import GetCondicionalMixin
+from core.routers import lectura_replica
 
 
-class EstudianteViewSet(viewsets.ModelViewSet):
+def _estadisticas_estudiante(estudiante, agregados):
+    """Datos de la respuesta de estadísticas a partir de los agregados de ResumenAcademico"""
+    # Calcular promedio general
+    promedio = calcular_promedio(agregados['suma_ponderada'], agregados['total_porcentaje'])
+    
+    # Calcular asistencia promedio
+    asistencia_promedio = 0
+    if agregados['total_clases']:
+        asistencia_promedio = (agregados['clases_presentes'] / agregados['total_clases']) * 100
+    
+    return {
+        'estudiante': EstudianteSerializer(estudiante).data,
+        'promedio_general': round(float(promedio), 2),
+        'asistencia_promedio': round(asistencia_promedio, 2),
+        'total_notas': agregados['total_notas'] or 0,
+        'total_asistencias': agregados['total_clases'] or 0,
+    }
+
+
+class EstudianteViewSet(GetCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar estudiantes"""
     queryset = Estudiante.objects.all()
     serializer_class = EstudianteSerializer
+    # El usuario y la carrera anidados forman parte del ETag (ver GetCondicionalMixin)
+    grupo_datos = 'estudiantes'
+    grupos_relacionados = ('estudiantes', 'carreras')
     
     def get_serializer_class(self):
         if self.action == 'create':
             return EstudianteCreateSerializer
         return EstudianteSerializer
     
+    def get_queryset(self):
+        """Cargar usuario y carrera en la misma consulta"""
+        return Estudiante.objects.select_related('user', 'carrera')
+    
     @action(detail=True, methods=['get'])
+    @lectura_replica
     def estadisticas(self, request, pk=None):
         """Obtener estadísticas del estudiante"""
         estudiante = self.get_object()
         
-        # Importar aquí para evitar importaciones circulares
-        from apps.notas.models import Nota
-        from apps.asistencias.models import Asistencia
-        
-        notas = Nota.objects.filter(estudiante=estudiante)
-        asistencias = Asistencia.objects.filter(estudiante=estudiante)
-        
-        # Calcular promedio general
-        promedio = 0
-        if notas.exists():
-            suma_ponderada = sum(nota.valor * (nota.porcentaje / 100) for nota in notas)
-            total_porcentaje = sum(nota.porcentaje for nota in notas)
-            if total_porcentaje > 0:
-                promedio = suma_ponderada / (total_porcentaje / 100)
+        # Los acumulados por materia se mantienen en ResumenAcademico
+        agregados = ResumenAcademico.objects.filter(estudiante=estudiante).aggregate(**agregados_resumen())
         
-        # Calcular asistencia promedio
-        asistencia_promedio = 0
-        if asistencias.exists():
-            total = asistencias.count()
-            presentes = asistencias.filter(asistio=True).count()
-            asistencia_promedio = (presentes / total) * 100
-        
-        return Response({
-            'estudiante': EstudianteSerializer(estudiante).data,
-            'promedio_general': round(promedio, 2),
-            'asistencia_promedio': round(asistencia_promedio, 2),
-            'total_notas': notas.count(),
-            'total_asistencias': asistencias.count(),
-        })
+        return Response(_estadisticas_estudiante(estudiante, agregados))
 
 
 class CarreraViewSet(viewsets.ReadOnlyModelViewSet):
@@ -65,6 +76,39 @@ class CarreraViewSet(viewsets.ReadOnlyModelViewSet):
         """Filtrar solo carreras activas"""
         queryset = Carrera.objects.filter(activa=True).order_by('nombre')
         return queryset
+    
+    @cachear_respuesta('carreras')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cachear_respuesta('carreras')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+def _consultar_estadisticas(pk):
+    """Estudiante y agregados de ResumenAcademico, o (None, None) si no existe"""
+    estudiante = Estudiante.objects.select_related('user', 'carrera').filter(pk=pk).first()
+    if estudiante is None:
+        return None, None
+    return estudiante, ResumenAcademico.objects.filter(estudiante_id=pk).aggregate(**agregados_resumen())
+
+
+@require_GET
+@lectura_replica
+async def estadisticas_async(request, pk):
+    """
+    Obtener estadísticas del estudiante (versión asíncrona para servidores ASGI)
+    
+    Las dos consultas van en un solo bloque síncrono: el ORM asíncrono las
+    ejecuta en el mismo hilo (thread_sensitive), así que con asyncio.gather
+    seguían en serie y pagaban un salto de hilo más cada una.
+    """
+    estudiante, agregados = await sync_to_async(_consultar_estadisticas)(pk)
+    if estudiante is None:
+        return JsonResponse({'detail': 'No Estudiante matches the given query.'}, status=404)
+    
+    return JsonResponse(_estadisticas_estudiante(estudiante, agregados))
 
 
 @api_view(['POST'])
@@ -91,16 +135,21 @@ def login_view(request):
         )
     
     # Verificar si el usuario tiene un perfil de estudiante
+    # (cargando su carrera en la misma consulta para serializarlo)
     try:
-        estudiante = user.estudiante
+        estudiante = Estudiante.objects.select_related('carrera').get(user=user)
+        estudiante.user = user
     except Estudiante.DoesNotExist:
         return Response(
             {'error': 'El usuario no tiene un perfil de estudiante'},
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Obtener o crear token
+    # Obtener o crear token, reemplazándolo si expiró
     token, created = Token.objects.get_or_create(user=user)
+    if not created and token_expirado(token.created):
+        token.delete()
+        token = Token.objects.create(user=user)
     
     return Response({
         'token': token.key,
@@ -157,7 +206,8 @@ def registro_view(request):
 def perfil_view(request):
     """Endpoint para obtener el perfil del estudiante autenticado"""
     try:
-        estudiante = request.user.estudiante
+        estudiante = Estudiante.objects.select_related('carrera').get(user=request.user)
+        estudiante.user = request.user
         return Response({
             'user': UserSerializer(request.user).data,
             'estudiante': EstudianteSerializer(estudiante).data
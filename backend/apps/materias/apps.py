@@ -5,4 +5,7 @@ class MateriasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.materias'
     verbose_name = 'Materias'
-
+    
+    def ready(self):
+        # Registrar las señales que invalidan la malla compilada
+        from . import signals  # noqa: F401
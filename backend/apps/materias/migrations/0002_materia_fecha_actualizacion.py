@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materias', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materia',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización'),
+        ),
+    ]
@@ -15,6 +15,7 @@ class Materia(models.Model):
         verbose_name='Prerequisitos'
     )
     activa = models.BooleanField(default=True, verbose_name='Activa')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
     
     class Meta:
         verbose_name = 'Materia'
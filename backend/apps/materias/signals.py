@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import Materia
+from .utils import invalidar_malla
+from core.cache import invalidar_grupo
+
+
+def _invalidar():
+    # Invalidar de inmediato (lecturas dentro de la misma transacción)
+    # y de nuevo al confirmar, por si otra petición reconstruyó la malla
+    # con datos anteriores al commit
+    invalidar_malla()
+    transaction.on_commit(invalidar_malla)
+    # Respuestas en caché y mallas compiladas de otros procesos
+    invalidar_grupo('materias')
+
+
+@receiver(post_save, sender=Materia)
+@receiver(post_delete, sender=Materia)
+def invalidar_malla_materia(sender, **kwargs):
+    """Invalidar la malla compilada al crear, modificar o eliminar una materia"""
+    _invalidar()
+
+
+@receiver(m2m_changed, sender=Materia.prerequisitos.through)
+def invalidar_malla_prerequisitos(sender, instance, action, pk_set, **kwargs):
+    """Invalidar la malla compilada cuando cambian los prerequisitos"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidar()
+        # Cambiar los prerequisitos no guarda la materia: actualizar su
+        # fecha_actualizacion para que cambie su ETag
+        ids = {instance.pk} | set(pk_set or ())
+        Materia.objects.filter(pk__in=ids).update(fecha_actualizacion=timezone.now())
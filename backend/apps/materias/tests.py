@@ -0,0 +1,172 @@
+import random
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from .models import Materia
+from .utils import MallaCompilada, invalidar_malla, planificar_semestres
+
+
+@override_settings(CACHE_COMPARTIDA=True)
+class RutaAcademicaConsultasTests(APITestCase):
+    """La ruta académica ejecuta las mismas consultas sin importar el tamaño de la malla"""
+    
+    def setUp(self):
+        cache.clear()
+        invalidar_malla()
+    
+    def crear_malla(self, cantidad):
+        """Cadena de materias en la que cada una requiere la anterior"""
+        materias = [
+            Materia.objects.create(codigo=f'MAT{i:03}', nombre=f'Materia {i}', creditos=3)
+            for i in range(cantidad)
+        ]
+        for anterior, siguiente in zip(materias, materias[1:]):
+            siguiente.prerequisitos.add(anterior)
+        return materias
+    
+    def test_consultas_constantes(self):
+        for cantidad in (5, 50):
+            with self.subTest(cantidad=cantidad):
+                Materia.objects.all().delete()
+                materias = self.crear_malla(cantidad)
+                aprobadas = [materia.id for materia in materias[:cantidad // 2]]
+                
+                # Materias activas + tabla de prerequisitos para compilar la malla
+                with self.assertNumQueries(2):
+                    respuesta = self.client.post('/api/materias/ruta_academica/',
+                                                 {'materias_aprobadas': aprobadas}, format='json')
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual([materia['id'] for materia in respuesta.data['orden_sugerido']],
+                                 [materias[cantidad // 2].id])
+                
+                # Con la malla ya compilada no se consulta la base de datos
+                with self.assertNumQueries(0):
+                    self.client.post('/api/materias/ruta_academica/',
+                                     {'materias_aprobadas': aprobadas}, format='json')
+    
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_sin_cache_compartida(self):
+        # Sin caché compartida la malla se construye en cada petición
+        self.crear_malla(3)
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                self.client.post('/api/materias/ruta_academica/', {'materias_aprobadas': []}, format='json')
+
+
+class MallaCompiladaTests(SimpleTestCase):
+    """Índices, orden topológico y materias disponibles de la malla compilada"""
+    
+    def setUp(self):
+        # 30 -> 20 -> 10 y 40 sin prerequisitos; 50 requiere una materia inactiva (99)
+        filas = [(10, 'C', 'Materia C', 3), (20, 'B', 'Materia B', 3), (30, 'A', 'Materia A', 3),
+                 (40, 'D', 'Materia D', 3), (50, 'E', 'Materia E', 3)]
+        self.malla = MallaCompilada(filas, [(20, 30), (10, 20), (50, 99)])
+    
+    def ids(self, indices):
+        return [int(self.malla.ids[i]) for i in indices]
+    
+    def test_orden_topologico(self):
+        orden = self.ids(self.malla.orden_topologico)
+        self.assertLess(orden.index(30), orden.index(20))
+        self.assertLess(orden.index(20), orden.index(10))
+    
+    def test_disponibles(self):
+        self.assertEqual(sorted(self.ids(self.malla.disponibles([]).nonzero()[0])), [30, 40])
+        self.assertEqual(sorted(self.ids(self.malla.disponibles([30, 99]).nonzero()[0])), [20, 40, 50])
+    
+    def test_como_json(self):
+        datos = self.malla.como_json()
+        self.assertEqual(len(datos['nodos']), 5)
+        self.assertCountEqual(datos['aristas'], [{'source': 30, 'target': 20}, {'source': 20, 'target': 10}])
+
+
+class PlanEstudiosTests(APITestCase):
+    """Plan de estudios por semestres con prerequisitos y límite de créditos"""
+    
+    def setUp(self):
+        cache.clear()
+        invalidar_malla()
+    
+    def crear(self, codigo, creditos=3, prerequisitos=()):
+        materia = Materia.objects.create(codigo=codigo, nombre=f'Materia {codigo}', creditos=creditos)
+        materia.prerequisitos.add(*prerequisitos)
+        return materia
+    
+    def plan(self, creditos_maximos=20, materias_aprobadas=()):
+        respuesta = self.client.post('/api/materias/plan_estudios/', {
+            'materias_aprobadas': list(materias_aprobadas), 'creditos_maximos': creditos_maximos,
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data
+    
+    def semestre_de(self, plan):
+        return {materia['id']: semestre['numero'] for semestre in plan['semestres'] for materia in semestre['materias']}
+    
+    def test_orden_de_prerequisitos(self):
+        a = self.crear('A')
+        b = self.crear('B', prerequisitos=[a])
+        c = self.crear('C', prerequisitos=[a, b])
+        d = self.crear('D')
+        
+        plan = self.plan()
+        semestre = self.semestre_de(plan)
+        self.assertLess(semestre[a.id], semestre[b.id])
+        self.assertLess(semestre[b.id], semestre[c.id])
+        self.assertEqual(semestre[d.id], 1)
+        self.assertEqual(plan['total_semestres'], 3)
+        self.assertEqual(plan['semestres_minimos'], 3)
+        
+        # Las materias aprobadas no se vuelven a planificar
+        self.assertEqual(set(self.semestre_de(self.plan(materias_aprobadas=[a.id]))), {b.id, c.id, d.id})
+    
+    def test_limite_de_creditos(self):
+        for i in range(4):
+            self.crear(f'M{i}', creditos=6)
+        grande = self.crear('GRANDE', creditos=25)
+        
+        plan = self.plan(creditos_maximos=12)
+        for semestre in plan['semestres']:
+            if grande.id in [materia['id'] for materia in semestre['materias']]:
+                self.assertEqual(len(semestre['materias']), 1)
+            else:
+                self.assertLessEqual(semestre['creditos'], 12)
+        self.assertEqual(plan['total_semestres'], 3)
+        self.assertEqual(plan['total_creditos'], 49)
+    
+    def test_ciclos_y_prerequisitos_inactivos(self):
+        a = self.crear('A')
+        b = self.crear('B', prerequisitos=[a])
+        a.prerequisitos.add(b)
+        c = self.crear('C', prerequisitos=[a])
+        inactiva = Materia.objects.create(codigo='INACTIVA', nombre='Inactiva', creditos=3, activa=False)
+        d = self.crear('D', prerequisitos=[inactiva])
+        e = self.crear('E')
+        
+        plan = self.plan()
+        self.assertEqual(set(self.semestre_de(plan)), {e.id})
+        self.assertCountEqual([materia['id'] for materia in plan['no_planificables']], [a.id, b.id, c.id, d.id])
+        self.assertEqual(plan['semestres_minimos'], 1)
+        
+        # Con el prerequisito inactivo aprobado, D se puede planificar
+        self.assertEqual(set(self.semestre_de(self.plan(materias_aprobadas=[inactiva.id]))), {d.id, e.id})
+    
+    def test_cota_inferior(self):
+        aleatorio = random.Random(1234)
+        for intento in range(200):
+            cantidad = aleatorio.randint(1, 15)
+            filas = [(i, f'M{i}', f'Materia {i}', aleatorio.randint(1, 12)) for i in range(1, cantidad + 1)]
+            # Prerequisitos al azar, que pueden formar ciclos
+            relaciones = [(aleatorio.randint(2, cantidad), aleatorio.randint(1, cantidad))
+                          for _ in range(aleatorio.randint(0, 2 * cantidad))] if cantidad > 1 else []
+            creditos_maximos = aleatorio.randint(3, 15)
+            
+            with self.subTest(intento=intento), \
+                    mock.patch('apps.materias.utils.obtener_malla',
+                               return_value=MallaCompilada(filas, [(m, p) for m, p in relaciones if m != p])):
+                plan = planificar_semestres([], creditos_maximos)
+                self.assertLessEqual(plan['semestres_minimos'], plan['total_semestres'])
+                planificadas = sum(len(semestre['materias']) for semestre in plan['semestres'])
+                self.assertEqual(planificadas + len(plan['no_planificables']), cantidad)
+
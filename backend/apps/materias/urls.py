@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MateriaViewSet
+from .views import MateriaViewSet, malla_curricular_async
 
 router = DefaultRouter()
 router.register(r'materias', MateriaViewSet, basename='materia')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # Variantes asíncronas (requieren un servidor ASGI para ser útiles)
+    path('async/materias/malla_curricular/', malla_curricular_async, name='materia-malla-curricular-async'),
 ]
 
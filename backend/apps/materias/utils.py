@@ -1,39 +1,177 @@
+import threading
+
 import networkx as nx
+import numpy as np
+from django.conf import settings
 from .models import Materia
+from core.cache import version_grupo
+from core.routers import lecturas_primaria
+
 
+# Límite de créditos por semestre usado por defecto en el plan de estudios
+CREDITOS_MAXIMOS_SEMESTRE = 20
 
-def construir_grafo_malla(materias):
+
+class MallaCompilada:
     """
-    Construye un grafo dirigido de la malla curricular usando networkx
+    Representación compacta e inmutable de la malla curricular
     
-    Args:
-        materias: QuerySet de materias
-    
-    Returns:
-        networkx.DiGraph: Grafo dirigido de la malla curricular
+    Las materias activas se indexan con enteros consecutivos (en el orden de
+    Materia.Meta.ordering) y los prerequisitos se guardan como arreglos numpy
+    de índices, junto con un orden topológico precalculado.
     """
-    G = nx.DiGraph()
     
-    # Agregar nodos (materias)
-    for materia in materias:
-        G.add_node(materia.id, 
-                   codigo=materia.codigo,
-                   nombre=materia.nombre,
-                   creditos=materia.creditos)
+    def __init__(self, filas, relaciones):
+        """
+        Args:
+            filas: Tuplas (id, codigo, nombre, creditos) de las materias activas
+            relaciones: Tuplas (materia_id, prerequisito_id) de la tabla intermedia
+        """
+        self.ids = np.array([fila[0] for fila in filas], dtype=np.int64)
+        self.codigos = [fila[1] for fila in filas]
+        self.nombres = [fila[2] for fila in filas]
+        self.creditos = np.array([fila[3] for fila in filas], dtype=np.int64)
+        self.indice = {materia_id: i for i, materia_id in enumerate(self.ids.tolist())}
+        
+        # Aristas prerequisito -> materia entre materias activas
+        aristas = [
+            (self.indice[prerequisito_id], self.indice[materia_id])
+            for materia_id, prerequisito_id in relaciones
+            if materia_id in self.indice and prerequisito_id in self.indice
+        ]
+        aristas = np.array(aristas, dtype=np.int64).reshape(-1, 2)
+        orden = np.lexsort((aristas[:, 1], aristas[:, 0]))
+        self.origenes = aristas[orden, 0]
+        self.destinos = aristas[orden, 1]
+        # Sucesores en formato CSR: los de la materia i son
+        # destinos[sucesores_ptr[i]:sucesores_ptr[i + 1]]
+        self.sucesores_ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.origenes, minlength=len(self.ids))))
+        ).astype(np.int64)
+        
+        # Todos los prerequisitos de cada materia activa (incluidos los de
+        # materias inactivas) como pares (índice de la materia, ID del prerequisito)
+        requisitos = np.array(
+            [(self.indice[materia_id], prerequisito_id)
+             for materia_id, prerequisito_id in relaciones if materia_id in self.indice],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        self.requisitos_materia = requisitos[:, 0]
+        self.requisitos_ids = requisitos[:, 1]
+        
+        self.orden_topologico = self._calcular_orden_topologico()
+        self._json = None
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def _calcular_orden_topologico(self):
+        """Orden topológico como arreglo de índices (por ID si hay ciclos)"""
+        grafo = nx.DiGraph()
+        grafo.add_nodes_from(range(len(self.ids)))
+        grafo.add_edges_from(zip(self.origenes.tolist(), self.destinos.tolist()))
+        try:
+            return np.array(list(nx.topological_sort(grafo)), dtype=np.int64)
+        except nx.NetworkXUnfeasible:
+            # Si hay ciclos, usar orden por ID
+            return np.argsort(self.ids, kind='stable')
+    
+    def como_json(self):
+        """Nodos y aristas listos para serializar (se calculan una sola vez)"""
+        if self._json is None:
+            self._json = {
+                'nodos': [
+                    {'id': materia_id, 'codigo': codigo, 'nombre': nombre, 'creditos': creditos}
+                    for materia_id, codigo, nombre, creditos in zip(
+                        self.ids.tolist(), self.codigos, self.nombres, self.creditos.tolist()
+                    )
+                ],
+                'aristas': [
+                    {'source': source, 'target': target}
+                    for source, target in zip(self.ids[self.origenes].tolist(), self.ids[self.destinos].tolist())
+                ],
+            }
+        return self._json
+    
+    def disponibles(self, materias_aprobadas):
+        """
+        Determina qué materias tienen todos sus prerequisitos aprobados
+        
+        Args:
+            materias_aprobadas: Iterable de IDs de materias aprobadas
+        
+        Returns:
+            numpy.ndarray: Máscara booleana por índice; las materias ya
+                           aprobadas quedan excluidas
+        """
+        aprobadas = np.array([int(materia_id) for materia_id in materias_aprobadas], dtype=np.int64)
+        cumplidos = np.isin(self.requisitos_ids, aprobadas)
+        faltantes = np.bincount(self.requisitos_materia[~cumplidos], minlength=len(self))
+        return (faltantes == 0) & ~np.isin(self.ids, aprobadas)
     
-    # Agregar aristas (prerequisitos)
-    for materia in materias:
-        for prerequisito in materia.prerequisitos.all():
-            if prerequisito.id in G.nodes():
-                G.add_edge(prerequisito.id, materia.id)
+    def sucesores(self, i):
+        """Índices de las materias que tienen a la materia i como prerequisito"""
+        return self.destinos[self.sucesores_ptr[i]:self.sucesores_ptr[i + 1]]
+
+
+_malla = None
+_malla_version = None
+_malla_lock = threading.Lock()
+
+
+def _construir_malla():
+    # La malla se comparte con todas las peticiones hasta el próximo
+    # cambio: se construye siempre desde la base primaria
+    with lecturas_primaria():
+        filas = list(Materia.objects.filter(activa=True).values_list('id', 'codigo', 'nombre', 'creditos'))
+        relaciones = list(
+            Materia.prerequisitos.through.objects.values_list('from_materia_id', 'to_materia_id')
+        )
+    return MallaCompilada(filas, relaciones)
+
+
+def obtener_malla():
+    """
+    Devuelve la malla curricular compilada, construyéndola si no está en caché
+    
+    La caché vive en memoria del proceso y se invalida con las señales de
+    Materia (ver apps.materias.signals). Además se compara con la versión del
+    grupo "materias" de la caché compartida, para reconstruirla cuando otro
+    proceso modificó las materias. Sin CACHE_COMPARTIDA esa versión no se
+    comparte entre procesos, así que la malla se construye en cada llamada.
     
-    return G
+    Returns:
+        MallaCompilada: Malla de las materias activas
+    """
+    global _malla, _malla_version
+    if not settings.CACHE_COMPARTIDA:
+        return _construir_malla()
+    # La versión se lee antes de consultar: un cambio concurrente deja una
+    # versión distinta y fuerza otra reconstrucción
+    version = version_grupo('materias')
+    malla = _malla
+    if malla is None or _malla_version != version:
+        with _malla_lock:
+            if _malla is None or _malla_version != version:
+                _malla = _construir_malla()
+                _malla_version = version
+            malla = _malla
+    return malla
+
+
+def invalidar_malla():
+    """Descarta la malla compilada para que se reconstruya en el próximo acceso"""
+    global _malla
+    _malla = None
 
 
 def obtener_ruta_academica(materias_aprobadas, materias_objetivo):
     """
     Obtiene la ruta académica recomendada para cursar ciertas materias
     
+    Trabaja sobre la malla compilada en memoria, por lo que no realiza
+    consultas adicionales sin importar el tamaño de la malla.
+    
     Args:
         materias_aprobadas: Lista de IDs de materias aprobadas
         materias_objetivo: Lista de IDs de materias objetivo
@@ -41,31 +179,132 @@ def obtener_ruta_academica(materias_aprobadas, materias_objetivo):
     Returns:
         dict: Ruta académica con orden sugerido
     """
-    todas_materias = Materia.objects.filter(activa=True)
-    grafo = construir_grafo_malla(todas_materias)
-    
-    # Orden topológico para determinar el orden de cursado
-    try:
-        orden_topologico = list(nx.topological_sort(grafo))
-    except nx.NetworkXError:
-        # Si hay ciclos, usar orden por código
-        orden_topologico = sorted([m.id for m in todas_materias])
-    
-    # Filtrar materias que pueden ser cursadas
-    materias_disponibles = []
-    materias_aprobadas_set = set(materias_aprobadas)
-    
-    for materia_id in orden_topologico:
-        if materia_id in materias_aprobadas_set:
-            continue
-        
-        materia = Materia.objects.get(id=materia_id)
-        if materia.puede_cursar([Materia.objects.get(id=mid) for mid in materias_aprobadas_set]):
-            materias_disponibles.append(materia)
+    malla = obtener_malla()
+    
+    # Materias que pueden ser cursadas, en orden topológico
+    disponibles = malla.disponibles(materias_aprobadas)
+    orden = malla.orden_topologico[disponibles[malla.orden_topologico]].tolist()
     
     return {
-        'orden_sugerido': [{'id': m.id, 'codigo': m.codigo, 'nombre': m.nombre} 
-                          for m in materias_disponibles],
-        'total_materias': len(materias_disponibles)
+        'orden_sugerido': [{'id': int(malla.ids[i]), 'codigo': malla.codigos[i], 'nombre': malla.nombres[i]}
+                          for i in orden],
+        'total_materias': len(orden)
     }
 
+
+def planificar_semestres(materias_aprobadas, creditos_maximos=CREDITOS_MAXIMOS_SEMESTRE):
+    """
+    Distribuye las materias pendientes en semestres respetando prerequisitos
+    y un límite de créditos por semestre
+    
+    Se usa planificación por listas: en cada semestre se consideran las
+    materias cuyos prerequisitos ya fueron cursados, priorizando las que
+    están al inicio de la cadena de prerequisitos más larga (ruta crítica)
+    y luego las de más créditos, y se empacan por primer ajuste hasta el
+    límite de créditos. Una materia con más créditos que el límite se
+    cursa sola en su semestre.
+    
+    Args:
+        materias_aprobadas: Lista de IDs de materias aprobadas
+        creditos_maximos: Créditos máximos por semestre
+    
+    Returns:
+        dict: Semestres con sus materias, cota inferior de semestres
+              y materias que no se pueden planificar (prerequisito inactivo
+              no aprobado o ciclo de prerequisitos)
+    """
+    malla = obtener_malla()
+    n = len(malla)
+    aprobadas = {int(materia_id) for materia_id in materias_aprobadas}
+    pendiente = ~np.isin(malla.ids, np.array(sorted(aprobadas), dtype=np.int64))
+    orden = malla.orden_topologico.tolist()
+    creditos = malla.creditos.tolist()
+    
+    # Materias con un prerequisito inactivo no aprobado no se pueden cursar,
+    # ni tampoco las que dependen de ellas
+    bloqueada = np.zeros(n, dtype=bool)
+    activas = set(malla.ids.tolist())
+    for i, prerequisito_id in zip(malla.requisitos_materia.tolist(), malla.requisitos_ids.tolist()):
+        if prerequisito_id not in aprobadas and prerequisito_id not in activas:
+            bloqueada[i] = True
+    for i in orden:
+        if bloqueada[i]:
+            bloqueada[malla.sucesores(i)] = True
+    planificable = pendiente & ~bloqueada
+    
+    # Longitud de la cadena de prerequisitos más larga que inicia en cada materia
+    altura = np.zeros(n, dtype=np.int64)
+    for i in reversed(orden):
+        if planificable[i]:
+            sucesores = malla.sucesores(i)
+            sucesores = sucesores[planificable[sucesores]]
+            altura[i] = 1 + (altura[sucesores].max() if len(sucesores) else 0)
+    
+    # Prerequisitos pendientes dentro de la malla activa
+    pendientes_previos = np.bincount(
+        malla.destinos[planificable[malla.origenes]], minlength=n
+    )
+    disponibles = [i for i in range(n) if planificable[i] and pendientes_previos[i] == 0]
+    
+    semestres = []
+    while disponibles:
+        disponibles.sort(key=lambda i: (-altura[i], -creditos[i], i))
+        semestre = []
+        carga = 0
+        restantes = []
+        for i in disponibles:
+            if carga + creditos[i] <= creditos_maximos or not semestre:
+                semestre.append(i)
+                carga += creditos[i]
+            else:
+                restantes.append(i)
+        
+        # Las materias liberadas se pueden cursar a partir del siguiente semestre
+        for i in semestre:
+            for sucesor in malla.sucesores(i).tolist():
+                if planificable[sucesor]:
+                    pendientes_previos[sucesor] -= 1
+                    if pendientes_previos[sucesor] == 0:
+                        restantes.append(sucesor)
+        
+        semestres.append((semestre, carga))
+        disponibles = restantes
+    
+    planificadas = [i for semestre, _ in semestres for i in semestre]
+    es_planificada = np.zeros(n, dtype=bool)
+    es_planificada[planificadas] = True
+    no_planificables = [i for i in orden if pendiente[i] and not es_planificada[i]]
+    total_creditos = sum(carga for _, carga in semestres)
+    
+    # Cota inferior de semestres, solo sobre las materias planificadas: la
+    # cadena de prerequisitos más larga (los semestres del plan están en
+    # orden topológico), o cada materia con más créditos que el límite en
+    # su propio semestre más el resto de créditos repartidos al límite
+    cadena = np.zeros(n, dtype=np.int64)
+    for i in planificadas:
+        cadena[i] = max(cadena[i], 1)
+        sucesores = malla.sucesores(i)
+        sucesores = sucesores[es_planificada[sucesores]]
+        cadena[sucesores] = np.maximum(cadena[sucesores], cadena[i] + 1)
+    excedidas = [i for i in planificadas if creditos[i] > creditos_maximos]
+    creditos_restantes = total_creditos - sum(creditos[i] for i in excedidas)
+    semestres_minimos = max(
+        int(cadena.max()) if n else 0,
+        len(excedidas) - (-creditos_restantes // creditos_maximos),
+    )
+    
+    def materia_json(i):
+        return {'id': int(malla.ids[i]), 'codigo': malla.codigos[i],
+                'nombre': malla.nombres[i], 'creditos': creditos[i]}
+    
+    return {
+        'semestres': [
+            {'numero': numero, 'creditos': carga, 'materias': [materia_json(i) for i in semestre]}
+            for numero, (semestre, carga) in enumerate(semestres, start=1)
+        ],
+        'total_semestres': len(semestres),
+        'total_creditos': total_creditos,
+        'creditos_maximos': creditos_maximos,
+        'semestres_minimos': semestres_minimos,
+        'no_planificables': [materia_json(i) for i in no_planificables],
+    }
@@ -1,22 +1,38 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from .models import Materia
 from .serializers import MateriaSerializer, MateriaListSerializer
-from .utils import construir_grafo_malla, obtener_ruta_academica
+from .utils import CREDITOS_MAXIMOS_SEMESTRE, obtener_malla, obtener_ruta_academica, planificar_semestres
+from core.cache import cachear_respuesta
+from core.mixins import GetCondicionalMixin
 
 
-class MateriaViewSet(viewsets.ModelViewSet):
+class MateriaViewSet(GetCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar materias"""
     queryset = Materia.objects.filter(activa=True)
     serializer_class = MateriaSerializer
+    # Los prerequisitos anidados forman parte del ETag (ver GetCondicionalMixin)
+    grupo_datos = 'materias'
+    grupos_relacionados = ('materias',)
     
     def get_serializer_class(self):
         if self.action == 'list':
             return MateriaListSerializer
         return MateriaSerializer
     
+    def get_queryset(self):
+        """Precargar prerequisitos cuando el serializer los incluye"""
+        queryset = Materia.objects.filter(activa=True)
+        if self.action != 'list':
+            queryset = queryset.prefetch_related('prerequisitos')
+        return queryset
+    
     @action(detail=True, methods=['get'])
+    @cachear_respuesta('materias')
     def prerequisitos(self, request, pk=None):
         """Obtener prerequisitos de una materia"""
         materia = self.get_object()
@@ -25,21 +41,42 @@ class MateriaViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cachear_respuesta('materias')
     def malla_curricular(self, request):
         """Obtener la malla curricular como grafo"""
-        materias = Materia.objects.filter(activa=True)
-        grafo = construir_grafo_malla(materias)
-        
-        # Convertir grafo a formato JSON
-        nodos = [{'id': m.id, 'codigo': m.codigo, 'nombre': m.nombre, 
-                 'creditos': m.creditos} for m in materias]
-        aristas = [{'source': edge[0], 'target': edge[1]} 
-                  for edge in grafo.edges()]
+        # La malla compilada ya contiene los nodos y aristas en formato JSON
+        return Response(obtener_malla().como_json())
+    
+    @action(detail=False, methods=['post'])
+    def ruta_academica(self, request):
+        """Obtener el orden sugerido de materias que se pueden cursar"""
+        materias_aprobadas = request.data.get('materias_aprobadas', [])
+        materias_objetivo = request.data.get('materias_objetivo', [])
+        try:
+            ruta = obtener_ruta_academica(materias_aprobadas, materias_objetivo)
+        except (TypeError, ValueError):
+            return Response({'error': 'materias_aprobadas debe ser una lista de IDs'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        return Response(ruta)
+    
+    @action(detail=False, methods=['post'])
+    def plan_estudios(self, request):
+        """Generar un plan de estudios semestre a semestre con límite de créditos"""
+        materias_aprobadas = request.data.get('materias_aprobadas', [])
+        try:
+            creditos_maximos = int(request.data.get('creditos_maximos', CREDITOS_MAXIMOS_SEMESTRE))
+        except (TypeError, ValueError):
+            creditos_maximos = 0
+        if creditos_maximos < 1:
+            return Response({'error': 'creditos_maximos debe ser un entero positivo'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'nodos': nodos,
-            'aristas': aristas
-        })
+        try:
+            plan = planificar_semestres(materias_aprobadas, creditos_maximos)
+        except (TypeError, ValueError):
+            return Response({'error': 'materias_aprobadas debe ser una lista de IDs'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        return Response(plan)
     
     @action(detail=False, methods=['post'])
     def verificar_prerequisitos(self, request):
@@ -73,3 +110,11 @@ class MateriaViewSet(viewsets.ModelViewSet):
         
         return Response(resultado)
 
+
+@require_GET
+async def malla_curricular_async(request):
+    """Obtener la malla curricular como grafo (versión asíncrona para servidores ASGI)"""
+    # La malla compilada vive en memoria del proceso; solo se consulta la
+    # base de datos cuando hay que reconstruirla
+    malla = await sync_to_async(obtener_malla)()
+    return JsonResponse(malla.como_json())
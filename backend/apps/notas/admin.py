@@ -1,8 +1,11 @@
 from django.contrib import admin
+from django.core.handlers.asgi import ASGIRequest
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
 from .models import Nota
+from .utils import COLUMNAS_EXPORTACION
+from core.exportacion import respuesta_exportacion
 
 
 @admin.register(Nota)
@@ -14,6 +17,8 @@ class NotaAdmin(ModelAdmin):
     list_per_page = 25
     date_hierarchy = 'fecha'
     
+    actions = ['exportar_csv']
+    
     fieldsets = (
         ('Información de la Nota', {
             'fields': ('estudiante', 'materia', 'valor', 'porcentaje', 'valor_ponderado', 'fecha'),
@@ -54,4 +59,8 @@ class NotaAdmin(ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('estudiante', 'estudiante__user', 'materia')
-
+    
+    @admin.action(description='Exportar seleccionadas a CSV')
+    def exportar_csv(self, request, queryset):
+        return respuesta_exportacion(queryset.order_by('-fecha', 'materia_id', 'id'), COLUMNAS_EXPORTACION, 'csv', 'notas',
+                                     asincrona=isinstance(request, ASGIRequest))
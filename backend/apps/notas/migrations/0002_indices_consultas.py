@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estudiantes', '0003_insertar_carreras_fijas'),
+        ('materias', '0001_initial'),
+        ('notas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nota',
+            index=models.Index(fields=['-fecha', 'materia', 'id'], name='nota_fecha_mat_id_idx'),
+        ),
+    ]
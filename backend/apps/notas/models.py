@@ -9,12 +9,17 @@ class Nota(models.Model):
     porcentaje = models.DecimalField(max_digits=5, decimal_places=2, verbose_name='Porcentaje')
     descripcion = models.CharField(max_length=200, blank=True, null=True, verbose_name='Descripción')
     fecha = models.DateField(auto_now_add=True, verbose_name='Fecha')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')
     
     class Meta:
         verbose_name = 'Nota'
         verbose_name_plural = 'Notas'
         ordering = ['-fecha', 'materia']
         unique_together = ['estudiante', 'materia', 'descripcion']
+        indexes = [
+            # Paginación por cursor
+            models.Index(fields=['-fecha', 'materia', 'id'], name='nota_fecha_mat_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.estudiante.codigo} - {self.materia.codigo}: {self.valor} ({self.porcentaje}%)"
@@ -17,6 +17,17 @@ class NotaSerializer(serializers.ModelSerializer):
         read_only_fields = ['fecha']
 
 
+class NotaCompactaSerializer(serializers.ModelSerializer):
+    """Serializer de Nota con solo los IDs de estudiante y materia"""
+    valor_ponderado = serializers.DecimalField(max_digits=5, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = Nota
+        fields = ['id', 'estudiante', 'materia', 'valor', 'porcentaje', 
+                  'descripcion', 'fecha', 'valor_ponderado']
+        read_only_fields = fields
+
+
 class NotaCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear una nota"""
     class Meta:
@@ -35,3 +46,27 @@ class NotaCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("El porcentaje debe estar entre 0 y 100")
         return value
 
+
+class NotaImportSerializer(NotaCreateSerializer):
+    """
+    Serializer para validar una fila de la importación masiva
+    
+    Las relaciones se reciben como IDs y la restricción única no se valida
+    aquí: ambas se resuelven por lote al escribir.
+    """
+    estudiante = serializers.IntegerField()
+    materia = serializers.IntegerField()
+    descripcion = serializers.CharField(max_length=200, allow_blank=True, allow_null=True, default='')
+    
+    class Meta(NotaCreateSerializer.Meta):
+        validators = []
+    
+    def validate_descripcion(self, value):
+        """
+        Guardar la falta de descripción como cadena vacía
+        
+        La restricción única incluye descripcion y en la base de datos dos NULL
+        nunca entran en conflicto, así que con NULL cada reimportación de la
+        fila insertaría una nota nueva en vez de actualizarla.
+        """
+        return value or ''
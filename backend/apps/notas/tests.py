@@ -0,0 +1,202 @@
+import json
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from .models import Nota
+from apps.estudiantes.models import Carrera, Estudiante, ResumenAcademico
+from apps.materias.models import Materia
+from core.pagination import PaginacionEstandar
+
+
+@override_settings(CACHE_COMPARTIDA=True)
+class ListadoNotasConsultasTests(APITestCase):
+    """El listado de notas ejecuta las mismas consultas con cualquier tamaño de página"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        materias = [Materia.objects.create(codigo=f'MAT{i}', nombre=f'Materia {i}', creditos=3) for i in range(3)]
+        for i in range(10):
+            estudiante = Estudiante.objects.create(
+                user=User.objects.create_user(username=f'estudiante{i}'),
+                codigo=f'E{i:03}',
+                carrera=carrera,
+            )
+            for materia in materias:
+                Nota.objects.create(estudiante=estudiante, materia=materia, valor=15, porcentaje=30,
+                                    descripcion='Parcial')
+    
+    def setUp(self):
+        cache.clear()
+    
+    def assertConsultasPorPagina(self, url, consultas):
+        for tamano in (5, 20):
+            with self.subTest(url=url, tamano=tamano), mock.patch.object(PaginacionEstandar, 'page_size', tamano):
+                with self.assertNumQueries(consultas):
+                    respuesta = self.client.get(url)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(len(respuesta.data['results']), tamano)
+    
+    def test_paginacion_por_numero(self):
+        # COUNT del paginador + página con estudiante, usuario, carrera y materia
+        self.assertConsultasPorPagina('/api/notas/', 2)
+    
+    def test_paginacion_por_cursor(self):
+        # Solo la página: ni el ETag ni el cursor cuentan filas
+        self.assertConsultasPorPagina('/api/notas/?paginacion=cursor', 1)
+    
+    def test_modo_compacto(self):
+        # Las relaciones incluidas salen de la misma consulta de la página
+        self.assertConsultasPorPagina('/api/notas/?compacto=1', 2)
+    
+    def test_etag_cambia_al_escribir(self):
+        etag = self.client.get('/api/notas/')['ETag']
+        self.assertEqual(self.client.get('/api/notas/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        
+        nota = Nota.objects.first()
+        nota.valor = 18
+        nota.save()
+        self.assertEqual(self.client.get('/api/notas/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_promedios_son_float(self):
+        materia_ids = ','.join(str(materia.pk) for materia in Materia.objects.all())
+        respuesta = self.client.get(f'/api/notas/promedios/?materias={materia_ids}')
+        
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual({type(fila['promedio']) for fila in respuesta.data}, {float})
+        self.assertEqual({fila['promedio'] for fila in respuesta.data}, {15.0})
+    
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_sin_cache_compartida_no_hay_etag(self):
+        self.assertNotIn('ETag', self.client.get('/api/notas/'))
+        self.assertNotIn('ETag', self.client.get(f'/api/notas/{Nota.objects.first().pk}/'))
+
+
+class ImportarNotasTests(APITestCase):
+    """Importación de notas en lote desde CSV y JSON lines"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        cls.materia = Materia.objects.create(codigo='MAT0', nombre='Materia 0', creditos=3)
+        cls.estudiantes = [
+            Estudiante.objects.create(user=User.objects.create_user(username=f'estudiante{i}'),
+                                      codigo=f'E{i:03}', carrera=carrera)
+            for i in range(10)
+        ]
+    
+    def csv_notas(self, filas):
+        lineas = ['estudiante,materia,descripcion,valor,porcentaje']
+        lineas += [','.join(str(valor) for valor in fila) for fila in filas]
+        return '\n'.join(lineas) + '\n'
+    
+    def importar(self, cuerpo, content_type='text/csv'):
+        return self.client.post('/api/notas/importar/', cuerpo, content_type=content_type)
+    
+    def test_reporte_de_errores_por_fila(self):
+        estudiante = self.estudiantes[0]
+        respuesta = self.importar(self.csv_notas([
+            (estudiante.id, self.materia.id, 'Parcial 1', '15.5', '30'),
+            (estudiante.id, self.materia.id, 'Parcial 2', '25', '30'),
+            (estudiante.id, self.materia.id, 'Parcial 3', '10', '130'),
+            (999999, self.materia.id, 'Parcial 4', '10', '30'),
+        ]))
+        
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['procesadas'], 4)
+        self.assertEqual(respuesta.data['escritas'], 1)
+        errores = {error['fila']: error['errores'] for error in respuesta.data['errores']}
+        self.assertEqual(sorted(errores), [3, 4, 5])
+        self.assertIn('valor', errores[3])
+        self.assertIn('porcentaje', errores[4])
+        self.assertIn('estudiante', errores[5])
+        self.assertEqual(Nota.objects.count(), 1)
+    
+    def test_actualiza_existentes_y_resumenes(self):
+        estudiante = self.estudiantes[0]
+        self.importar(self.csv_notas([(estudiante.id, self.materia.id, 'Parcial 1', '10', '50')]))
+        lineas = [
+            json.dumps({'estudiante': estudiante.id, 'materia': self.materia.id, 'descripcion': 'Parcial 1',
+                        'valor': '20', 'porcentaje': '50'}),
+            json.dumps({'estudiante': estudiante.id, 'materia': self.materia.id, 'descripcion': 'Parcial 2',
+                        'valor': '10', 'porcentaje': '50'}),
+        ]
+        respuesta = self.importar('\n'.join(lineas), content_type='application/x-ndjson')
+        
+        self.assertEqual(respuesta.data['escritas'], 2)
+        self.assertEqual(Nota.objects.count(), 2)
+        self.assertEqual(Nota.objects.get(descripcion='Parcial 1').valor, 20)
+        resumen = ResumenAcademico.objects.get(estudiante=estudiante, materia=self.materia)
+        self.assertEqual(resumen.total_notas, 2)
+        self.assertEqual(resumen.suma_ponderada, 20 * 50 + 10 * 50)
+    
+    def test_reimportar_sin_descripcion_actualiza(self):
+        estudiante, otro = self.estudiantes[:2]
+        lineas = '\n'.join([
+            json.dumps({'estudiante': estudiante.id, 'materia': self.materia.id, 'descripcion': None,
+                        'valor': '10', 'porcentaje': '50'}),
+            json.dumps({'estudiante': otro.id, 'materia': self.materia.id, 'valor': '10', 'porcentaje': '50'}),
+        ])
+        self.importar(lineas, content_type='application/x-ndjson')
+        respuesta = self.importar(lineas.replace('"10"', '"12"'), content_type='application/x-ndjson')
+        self.importar(self.csv_notas([(estudiante.id, self.materia.id, '', '14', '50')]))
+        
+        self.assertEqual(respuesta.data['escritas'], 2)
+        self.assertEqual(Nota.objects.count(), 2)
+        self.assertEqual(Nota.objects.get(estudiante=estudiante).valor, 14)
+        self.assertEqual(Nota.objects.get(estudiante=otro).valor, 12)
+        resumen = ResumenAcademico.objects.get(estudiante=estudiante, materia=self.materia)
+        self.assertEqual(resumen.total_notas, 1)
+    
+    @override_settings(CACHE_COMPARTIDA=True)
+    def test_etag_cambia_al_importar(self):
+        etag = self.client.get('/api/notas/')['ETag']
+        self.importar(self.csv_notas([(self.estudiantes[0].id, self.materia.id, 'Parcial 1', '10', '50')]))
+        self.assertEqual(self.client.get('/api/notas/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_consultas_independientes_del_numero_de_filas(self):
+        consultas = []
+        for cantidad in (2, 10):
+            filas = [(estudiante.id, self.materia.id, f'Taller {cantidad}', '15', '10')
+                     for estudiante in self.estudiantes[:cantidad]]
+            with CaptureQueriesContext(connection) as contexto:
+                respuesta = self.importar(self.csv_notas(filas))
+            self.assertEqual(respuesta.data['escritas'], cantidad)
+            consultas.append(len(contexto))
+        self.assertEqual(consultas[0], consultas[1])
+
+
+class ExportarNotasTests(APITestCase):
+    """La exportación se envía por partes también bajo ASGI"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        materia = Materia.objects.create(codigo='MAT0', nombre='Materia 0', creditos=3)
+        estudiante = Estudiante.objects.create(user=User.objects.create_user(username='estudiante'), codigo='E000',
+                                               carrera=carrera)
+        Nota.objects.bulk_create([
+            Nota(estudiante=estudiante, materia=materia, valor=15, porcentaje=1, descripcion=f'Taller {i}')
+            for i in range(5)
+        ])
+    
+    @mock.patch('core.exportacion.TAMANO_CHUNK', 2)
+    def test_wsgi(self):
+        respuesta = self.client.get('/api/notas/exportar/')
+        
+        self.assertFalse(respuesta.is_async)
+        self.assertEqual(len(b''.join(respuesta.streaming_content).decode().splitlines()), 6)
+    
+    @mock.patch('core.exportacion.TAMANO_CHUNK', 2)
+    async def test_asgi(self):
+        respuesta = await AsyncClient().get('/api/notas/exportar/', {'formato': 'jsonl'})
+        partes = [parte async for parte in respuesta]
+        
+        self.assertTrue(respuesta.is_async)
+        self.assertEqual(len(partes), 3)
+        self.assertEqual(len(b''.join(partes).decode().splitlines()), 5)
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotaViewSet
+from .views import NotaViewSet, promedio_estudiante_async, promedio_materia_async
 
 router = DefaultRouter()
 router.register(r'notas', NotaViewSet, basename='nota')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # Variantes asíncronas (requieren un servidor ASGI para ser útiles)
+    path('async/notas/promedio_estudiante/', promedio_estudiante_async, name='nota-promedio-estudiante-async'),
+    path('async/notas/promedio_materia/', promedio_materia_async, name='nota-promedio-materia-async'),
 ]
 
@@ -0,0 +1,44 @@
+from django.db.models import Count, F, Sum
+
+# Columnas de la exportación (encabezado, campo); coinciden con las de la importación
+COLUMNAS_EXPORTACION = (
+    ('id', 'id'),
+    ('estudiante', 'estudiante_id'),
+    ('estudiante_codigo', 'estudiante__codigo'),
+    ('materia', 'materia_id'),
+    ('materia_codigo', 'materia__codigo'),
+    ('descripcion', 'descripcion'),
+    ('valor', 'valor'),
+    ('porcentaje', 'porcentaje'),
+    ('fecha', 'fecha'),
+)
+
+
+def agregados_promedio():
+    """
+    Expresiones de agregación para calcular el promedio ponderado en SQL
+    
+    Returns:
+        dict: suma_ponderada (valor * porcentaje), total_porcentaje y total_notas
+    """
+    return {
+        'suma_ponderada': Sum(F('valor') * F('porcentaje')),
+        'total_porcentaje': Sum('porcentaje'),
+        'total_notas': Count('id'),
+    }
+
+
+def calcular_promedio(suma_ponderada, total_porcentaje):
+    """
+    Calcula el promedio ponderado (escala 0-20) a partir de los agregados
+    
+    Args:
+        suma_ponderada: Suma de valor * porcentaje
+        total_porcentaje: Suma de porcentajes
+    
+    Returns:
+        Decimal | int: Promedio ponderado, o 0 si no hay porcentajes
+    """
+    if not total_porcentaje:
+        return 0
+    return suma_ponderada / total_porcentaje
@@ -1,15 +1,54 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Avg, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from .models import Nota
-from .serializers import NotaSerializer, NotaCreateSerializer
+from .serializers import NotaSerializer, NotaCompactaSerializer, NotaCreateSerializer, NotaImportSerializer
+from .utils import COLUMNAS_EXPORTACION, calcular_promedio
+from apps.estudiantes.models import Estudiante, ResumenAcademico
+from apps.estudiantes.serializers import EstudianteSerializer
+from apps.estudiantes.utils import agregados_resumen, reconstruir_resumenes
+from apps.materias.models import Materia
+from apps.materias.serializers import MateriaListSerializer
+from core.cache import invalidar_grupo
+from core.exportacion import filtrar_fechas, respuesta_exportacion
+from core.importacion import importar_filas, leer_filas
+from core.mixins import GetCondicionalMixin, RepresentacionCompactaMixin
+from core.routers import lectura_replica
+from core.utils import parsear_ids
 
 
-class NotaViewSet(viewsets.ModelViewSet):
+def _resumen_promedio(agregados):
+    """Promedio y total de notas a partir de los agregados de ResumenAcademico"""
+    promedio = calcular_promedio(agregados['suma_ponderada'], agregados['total_porcentaje'])
+    return {
+        'promedio': round(float(promedio), 2),
+        'total_notas': agregados['total_notas'] or 0
+    }
+
+
+def _despues_de_importar(objetos):
+    """bulk_create no envía señales: actualizar los resúmenes y el ETag de los listados"""
+    reconstruir_resumenes({objeto.estudiante_id for objeto in objetos})
+    invalidar_grupo('notas')
+
+
+class NotaViewSet(GetCondicionalMixin, RepresentacionCompactaMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar notas"""
     queryset = Nota.objects.all()
     serializer_class = NotaSerializer
+    serializer_compacto_class = NotaCompactaSerializer
+    relaciones_compactas = (
+        ('estudiantes', 'estudiante', EstudianteSerializer),
+        ('materias', 'materia', MateriaListSerializer),
+    )
+    # Grupos de core.cache que forman parte del ETag (ver GetCondicionalMixin)
+    grupo_datos = 'notas'
+    grupos_relacionados = ('estudiantes', 'materias', 'carreras')
+    # Ordenamiento para la paginación por cursor (?paginacion=cursor)
+    ordenamiento_cursor = ('-fecha', 'materia_id', 'id')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -18,7 +57,8 @@ class NotaViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filtrar notas por estudiante si se proporciona"""
-        queryset = Nota.objects.all()
+        # Cargar las relaciones anidadas del serializer en la misma consulta
+        queryset = Nota.objects.select_related('estudiante__user', 'estudiante__carrera', 'materia')
         estudiante_id = self.request.query_params.get('estudiante', None)
         materia_id = self.request.query_params.get('materia', None)
         
@@ -30,6 +70,7 @@ class NotaViewSet(viewsets.ModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'])
+    @lectura_replica
     def promedio_estudiante(self, request):
         """Obtener promedio de un estudiante"""
         estudiante_id = request.query_params.get('estudiante', None)
@@ -37,29 +78,15 @@ class NotaViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Se requiere el parámetro estudiante'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        notas = Nota.objects.filter(estudiante_id=estudiante_id)
-        
-        if not notas.exists():
-            return Response({
-                'estudiante_id': estudiante_id,
-                'promedio': 0,
-                'total_notas': 0
-            })
-        
-        suma_ponderada = sum(nota.valor_ponderado for nota in notas)
-        total_porcentaje = sum(nota.porcentaje for nota in notas)
-        
-        promedio = 0
-        if total_porcentaje > 0:
-            promedio = (suma_ponderada / total_porcentaje) * 100
+        agregados = ResumenAcademico.objects.filter(estudiante_id=estudiante_id).aggregate(**agregados_resumen())
         
         return Response({
             'estudiante_id': estudiante_id,
-            'promedio': round(promedio, 2),
-            'total_notas': notas.count()
+            **_resumen_promedio(agregados)
         })
     
     @action(detail=False, methods=['get'])
+    @lectura_replica
     def promedio_materia(self, request):
         """Obtener promedio de una materia"""
         materia_id = request.query_params.get('materia', None)
@@ -67,25 +94,125 @@ class NotaViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Se requiere el parámetro materia'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        notas = Nota.objects.filter(materia_id=materia_id)
+        agregados = ResumenAcademico.objects.filter(materia_id=materia_id).aggregate(**agregados_resumen())
+        
+        return Response({
+            'materia_id': materia_id,
+            **_resumen_promedio(agregados)
+        })
+    
+    @action(detail=False, methods=['get'])
+    @lectura_replica
+    def promedios(self, request):
+        """Obtener promedios de varios estudiantes o varias materias en una sola consulta"""
+        if 'estudiantes' in request.query_params:
+            campo, parametro = 'estudiante_id', 'estudiantes'
+        elif 'materias' in request.query_params:
+            campo, parametro = 'materia_id', 'materias'
+        else:
+            return Response({'error': 'Se requiere el parámetro estudiantes o materias'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            ids = parsear_ids(request.query_params[parametro])
+        except ValueError:
+            return Response({'error': f'El parámetro {parametro} debe ser una lista de IDs separados por comas'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        agregados = {
+            fila[campo]: fila
+            for fila in ResumenAcademico.objects.filter(**{f'{campo}__in': ids})
+            .values(campo)
+            .annotate(**agregados_resumen())
+        }
         
-        if not notas.exists():
-            return Response({
-                'materia_id': materia_id,
-                'promedio': 0,
-                'total_notas': 0
+        resultados = []
+        for id_ in ids:
+            fila = agregados.get(id_)
+            if fila is None:
+                resultados.append({campo: id_, 'promedio': 0, 'total_notas': 0})
+                continue
+            promedio = calcular_promedio(fila['suma_ponderada'], fila['total_porcentaje'])
+            resultados.append({
+                campo: id_,
+                'promedio': round(float(promedio), 2),
+                'total_notas': fila['total_notas']
             })
         
-        suma_ponderada = sum(nota.valor_ponderado for nota in notas)
-        total_porcentaje = sum(nota.porcentaje for nota in notas)
+        return Response(resultados)
+    
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        """
+        Importar notas en lote desde CSV (text/csv) o JSON lines (application/x-ndjson)
         
-        promedio = 0
-        if total_porcentaje > 0:
-            promedio = (suma_ponderada / total_porcentaje) * 100
+        Las filas que ya existen se actualizan. Devuelve un reporte con los
+        errores de validación por fila.
+        """
+        reporte = importar_filas(
+            leer_filas(request),
+            NotaImportSerializer,
+            Nota,
+            relaciones={'estudiante': Estudiante, 'materia': Materia},
+            unique_fields=['estudiante', 'materia', 'descripcion'],
+            update_fields=['valor', 'porcentaje', 'fecha_actualizacion'],
+            al_escribir=_despues_de_importar,
+        )
+        return Response(reporte)
+    
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exportar notas en CSV o JSON lines (?formato=csv|jsonl)
         
-        return Response({
-            'materia_id': materia_id,
-            'promedio': round(promedio, 2),
-            'total_notas': notas.count()
-        })
+        Acepta los filtros del listado (estudiante, materia) y el rango de
+        fechas desde/hasta. Las filas se envían por partes, sin cargar la
+        consulta completa en memoria.
+        """
+        try:
+            queryset = filtrar_fechas(self.get_queryset(), request.query_params)
+            return respuesta_exportacion(
+                queryset.order_by(*self.ordenamiento_cursor),
+                COLUMNAS_EXPORTACION,
+                request.query_params.get('formato', 'csv'),
+                'notas',
+                asincrona=isinstance(request._request, ASGIRequest),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+
+# Variantes asíncronas para servidores ASGI (/api/async/...), con la misma
+# respuesta que las acciones del ViewSet. La consulta se ejecuta igualmente
+# en el hilo del ORM (sync_to_async), no en paralelo con otras.
+
+@require_GET
+@lectura_replica
+async def promedio_estudiante_async(request):
+    """Obtener promedio de un estudiante (versión asíncrona)"""
+    estudiante_id = request.GET.get('estudiante', None)
+    if not estudiante_id:
+        return JsonResponse({'error': 'Se requiere el parámetro estudiante'}, status=400)
+    
+    agregados = await ResumenAcademico.objects.filter(estudiante_id=estudiante_id).aaggregate(**agregados_resumen())
+    
+    return JsonResponse({
+        'estudiante_id': estudiante_id,
+        **_resumen_promedio(agregados)
+    })
+
+
+@require_GET
+@lectura_replica
+async def promedio_materia_async(request):
+    """Obtener promedio de una materia (versión asíncrona)"""
+    materia_id = request.GET.get('materia', None)
+    if not materia_id:
+        return JsonResponse({'error': 'Se requiere el parámetro materia'}, status=400)
+    
+    agregados = await ResumenAcademico.objects.filter(materia_id=materia_id).aaggregate(**agregados_resumen())
+    
+    return JsonResponse({
+        'materia_id': materia_id,
+        **_resumen_promedio(agregados)
+    })
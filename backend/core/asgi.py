@@ -3,6 +3,9 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+El stream de alertas (/api/alertas/stream/) mantiene la conexión abierta y
+necesita un servidor ASGI, por ejemplo: uvicorn core.asgi:application
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
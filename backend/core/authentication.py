@@ -0,0 +1,81 @@
+"""
+Autenticación por token con caché y expiración opcional
+"""
+import hashlib
+from datetime import timedelta
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+
+def _clave_token(key):
+    # La clave de la caché no contiene el token en claro
+    return f'token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def token_expirado(creado):
+    """
+    Indica si un token creado en la fecha dada ya expiró
+    
+    Args:
+        creado: Fecha de creación del token
+    
+    Returns:
+        bool: True si TOKEN_EXPIRACION_HORAS es mayor que 0 y se cumplió el plazo
+    """
+    horas = settings.TOKEN_EXPIRACION_HORAS
+    return bool(horas) and creado + timedelta(hours=horas) < timezone.now()
+
+
+def invalidar_token(key):
+    """Descarta de la caché los datos de un token (al eliminarlo o cambiar su usuario)"""
+    cache.delete(_clave_token(key))
+
+
+class AutenticacionTokenCache(TokenAuthentication):
+    """
+    TokenAuthentication que guarda en caché el token -> usuario
+    
+    La primera petición con un token consulta el token, el usuario y el ID
+    de su estudiante en una sola consulta; las siguientes, durante
+    TOKEN_CACHE_SEGUNDOS, no consultan la base de datos. El ID del
+    estudiante queda disponible en request.user.estudiante_id (None si el
+    usuario no tiene perfil de estudiante).
+    
+    La caché se invalida al eliminar el token (logout) o modificar el
+    usuario (ver apps.estudiantes.signals). Con TOKEN_CACHE_SEGUNDOS en 0
+    no se usa la caché y cada petición consulta el token.
+    """
+    
+    def authenticate_credentials(self, key):
+        clave = _clave_token(key)
+        usar_cache = settings.TOKEN_CACHE_SEGUNDOS > 0
+        datos = cache.get(clave) if usar_cache else None
+        if datos is None:
+            model = self.get_model()
+            try:
+                token = (
+                    model.objects.select_related('user')
+                    .annotate(estudiante_id=F('user__estudiante__id'))
+                    .get(key=key)
+                )
+            except model.DoesNotExist:
+                raise AuthenticationFailed('Token inválido.')
+            datos = (token.user, token.created, token.estudiante_id)
+            if usar_cache:
+                cache.set(clave, datos, settings.TOKEN_CACHE_SEGUNDOS)
+        
+        usuario, creado, estudiante_id = datos
+        if not usuario.is_active:
+            raise AuthenticationFailed('Usuario inactivo o eliminado.')
+        if token_expirado(creado):
+            self.get_model().objects.filter(key=key).delete()
+            raise AuthenticationFailed('El token expiró. Inicie sesión de nuevo.')
+        
+        usuario.estudiante_id = estudiante_id
+        token = self.get_model()(key=key, user=usuario, created=creado)
+        return (usuario, token)
@@ -0,0 +1,117 @@
+"""
+Caché de respuestas por grupo de datos con validación condicional (ETag/Last-Modified)
+
+Cada grupo ("carreras", "materias") tiene una versión guardada en la caché
+compartida: el instante, en nanosegundos, de su último cambio. Las respuestas
+se guardan bajo una clave que incluye esa versión, así que invalidar un grupo
+consiste solo en cambiar su versión; las entradas anteriores quedan
+inaccesibles y expiran solas.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routers import lecturas_primaria
+
+
+def version_grupo(grupo):
+    """
+    Devuelve la versión actual de un grupo, creándola si no existe
+    
+    Si la versión se perdió (caché reiniciada o expulsada) se crea una nueva
+    con el instante actual, lo que invalida cualquier respuesta anterior.
+    """
+    clave = f'version:{grupo}'
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+def invalidar_grupo(grupo):
+    """
+    Cambia la versión de un grupo para descartar sus respuestas en caché
+    
+    Se invalida de inmediato y de nuevo al confirmar la transacción, por si
+    otra petición guardó en caché datos anteriores al commit.
+    """
+    def invalidar():
+        cache.set(f'version:{grupo}', time.time_ns(), timeout=None)
+    invalidar()
+    transaction.on_commit(invalidar)
+
+
+def etag_coincide(request, etag):
+    """Indica si la cabecera If-None-Match de la petición incluye el ETag"""
+    if_none_match = request.headers.get('If-None-Match', '')
+    return if_none_match.strip() == '*' or etag in [valor.strip() for valor in if_none_match.split(',')]
+
+
+def _no_modificada(request, etag, ultima_modificacion):
+    if 'If-None-Match' in request.headers:
+        return etag_coincide(request, etag)
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and ultima_modificacion <= if_modified_since
+
+
+def cachear_respuesta(grupo, timeout=DEFAULT_TIMEOUT):
+    """
+    Decorador que guarda en caché los datos de una vista GET de solo lectura
+    
+    La respuesta lleva ETag y Last-Modified derivados de la versión del
+    grupo; si el cliente ya tiene la versión vigente se responde 304 sin
+    consultar la base de datos ni la caché de respuestas. Las respuestas que
+    se guardan se calculan siempre con lecturas de la base primaria, aunque
+    la vista use @lectura_replica. Sin CACHE_COMPARTIDA la vista se ejecuta
+    sin caché ni ETag, porque la versión del grupo no sería la misma en
+    todos los procesos.
+    
+    Args:
+        grupo: Grupo de datos del que depende la respuesta
+        timeout: Segundos en caché (por defecto el TIMEOUT de CACHES)
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not settings.CACHE_COMPARTIDA:
+                return funcion(self, request, *args, **kwargs)
+            
+            version = version_grupo(grupo)
+            ruta = request.get_full_path()
+            firma = hashlib.md5(f'{grupo}:{version}:{ruta}'.encode()).hexdigest()
+            etag = f'W/"{firma}"'
+            ultima_modificacion = version // 1_000_000_000
+            
+            if _no_modificada(request, etag, ultima_modificacion):
+                respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                clave = f'respuesta:{firma}'
+                datos = cache.get(clave)
+                if datos is None:
+                    # Lo que se guarda queda vigente hasta el próximo cambio del
+                    # grupo: no debe salir de una réplica con retraso
+                    with lecturas_primaria():
+                        respuesta = funcion(self, request, *args, **kwargs)
+                    if respuesta.status_code != status.HTTP_200_OK:
+                        return respuesta
+                    cache.set(clave, respuesta.data, timeout)
+                else:
+                    respuesta = Response(datos)
+            
+            respuesta['ETag'] = etag
+            respuesta['Last-Modified'] = http_date(ultima_modificacion)
+            # Los clientes pueden guardar la respuesta pero deben revalidarla
+            patch_cache_control(respuesta, no_cache=True)
+            return respuesta
+        return envoltura
+    return decorador
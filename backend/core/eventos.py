@@ -0,0 +1,171 @@
+"""
+Publicación y suscripción de eventos para los streams Server-Sent Events
+
+Los eventos se publican desde código síncrono (señales, vistas, comandos) y
+se consumen desde vistas asíncronas. Cada suscripción tiene una cola
+acotada: si el cliente no consume a tiempo, la cola se descarta y se
+entrega un único evento de desbordamiento para que el cliente se
+resincronice.
+
+Backends (EVENTOS_BACKEND):
+    local: en memoria del proceso; solo recibe los eventos publicados en el
+           mismo proceso (un servidor ASGI con un solo worker)
+    redis: canales pub/sub de Redis (requiere el paquete redis); comparte
+           los eventos entre procesos, incluido el comando generar_alertas
+"""
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+
+EVENTO_DESBORDAMIENTO = {'evento': 'desbordamiento'}
+
+
+class Suscripcion:
+    """Cola acotada de eventos de un cliente, ligada a su event loop"""
+    
+    def __init__(self, tamano_cola):
+        self.cola = asyncio.Queue(maxsize=tamano_cola)
+        self.loop = asyncio.get_running_loop()
+    
+    def entregar(self, evento):
+        """Encola un evento; debe ejecutarse en el loop de la suscripción"""
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # El cliente va atrasado: descartar lo pendiente y avisarle
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(EVENTO_DESBORDAMIENTO)
+    
+    def entregar_desde_otro_hilo(self, evento):
+        self.loop.call_soon_threadsafe(self.entregar, evento)
+
+
+class BackendLocal:
+    """Pub/sub en memoria del proceso"""
+    
+    def __init__(self):
+        self._suscripciones = {}
+        self._lock = threading.Lock()
+    
+    def publicar(self, canal, evento):
+        with self._lock:
+            suscripciones = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.entregar_desde_otro_hilo(evento)
+            except RuntimeError:
+                # El loop de la suscripción ya se cerró
+                pass
+    
+    @asynccontextmanager
+    async def suscripcion(self, canal, tamano_cola):
+        suscripcion = Suscripcion(tamano_cola)
+        with self._lock:
+            self._suscripciones.setdefault(canal, set()).add(suscripcion)
+        try:
+            yield suscripcion
+        finally:
+            with self._lock:
+                suscripciones = self._suscripciones.get(canal)
+                if suscripciones is not None:
+                    suscripciones.discard(suscripcion)
+                    if not suscripciones:
+                        del self._suscripciones[canal]
+
+
+class BackendRedis:
+    """Pub/sub con canales de Redis, compartido entre procesos"""
+    
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('EVENTOS_BACKEND=redis requiere instalar el paquete redis')
+        self.url = url
+        self.cliente = redis.Redis.from_url(url)
+    
+    def publicar(self, canal, evento):
+        self.cliente.publish(canal, json.dumps(evento, cls=DjangoJSONEncoder))
+    
+    @asynccontextmanager
+    async def suscripcion(self, canal, tamano_cola):
+        import redis.asyncio
+        
+        suscripcion = Suscripcion(tamano_cola)
+        cliente = redis.asyncio.Redis.from_url(self.url)
+        pubsub = cliente.pubsub()
+        await pubsub.subscribe(canal)
+        
+        async def leer():
+            async for mensaje in pubsub.listen():
+                if mensaje['type'] == 'message':
+                    suscripcion.entregar(json.loads(mensaje['data']))
+        
+        tarea = asyncio.create_task(leer())
+        try:
+            yield suscripcion
+        finally:
+            tarea.cancel()
+            await pubsub.unsubscribe(canal)
+            await pubsub.aclose()
+            await cliente.aclose()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def obtener_backend():
+    """Devuelve el backend configurado en EVENTOS_BACKEND, creándolo una sola vez"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.EVENTOS_BACKEND == 'redis':
+                    _backend = BackendRedis(settings.EVENTOS_REDIS_URL)
+                elif settings.EVENTOS_BACKEND == 'local':
+                    _backend = BackendLocal()
+                else:
+                    raise ImproperlyConfigured(f'EVENTOS_BACKEND desconocido: {settings.EVENTOS_BACKEND}')
+    return _backend
+
+
+def formatear_sse(evento):
+    """
+    Convierte un evento al formato de texto de Server-Sent Events
+    
+    El campo "evento" se envía como tipo del evento y, si existe, "id" como
+    ID del evento, que el navegador devuelve en Last-Event-ID al reconectarse.
+    """
+    lineas = [f"event: {evento['evento']}"]
+    if 'id' in evento:
+        lineas.append(f"id: {evento['id']}")
+    lineas.append(f'data: {json.dumps(evento, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lineas) + '\n\n'
+
+
+def publicar(canal, evento):
+    """
+    Publica un evento en un canal
+    
+    Args:
+        canal: Nombre del canal (por ejemplo "alertas:12")
+        evento: dict serializable a JSON
+    """
+    obtener_backend().publicar(canal, evento)
+
+
+def suscripcion(canal):
+    """
+    Suscribe al canal durante un bloque async with
+    
+    Returns:
+        Context manager asíncrono que entrega una Suscripcion
+    """
+    return obtener_backend().suscripcion(canal, settings.EVENTOS_TAMANO_COLA)
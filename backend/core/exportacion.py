@@ -0,0 +1,111 @@
+"""
+Exportación de registros en CSV o JSON lines sin cargar la consulta en memoria
+
+Las filas se leen con values_list e .iterator(), que en PostgreSQL usa un
+cursor del lado del servidor, y se envían con StreamingHttpResponse a medida
+que se generan. Bajo ASGI la respuesta necesita un iterador asíncrono: con
+uno síncrono Django lee el archivo completo en memoria antes de enviarlo.
+"""
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+TAMANO_CHUNK = 2000
+
+
+class _Eco:
+    """Buffer que devuelve lo escrito, para generar CSV línea por línea"""
+    
+    def write(self, valor):
+        return valor
+
+
+def filtrar_fechas(queryset, params, campo='fecha'):
+    """
+    Filtrar un queryset por los parámetros desde/hasta (YYYY-MM-DD)
+    
+    Args:
+        queryset: QuerySet a filtrar
+        params: query_params de la petición
+        campo: Campo de fecha del modelo
+    
+    Returns:
+        QuerySet: Queryset filtrado
+    
+    Raises:
+        ValueError: Si alguna fecha no es válida
+    """
+    for parametro, lookup in (('desde', 'gte'), ('hasta', 'lte')):
+        valor = params.get(parametro)
+        if not valor:
+            continue
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ValueError(f'Fecha inválida en {parametro}: {valor}')
+        queryset = queryset.filter(**{f'{campo}__{lookup}': fecha})
+    return queryset
+
+
+def _filas_csv(encabezados, filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(encabezados)
+    for fila in filas:
+        yield escritor.writerow(fila)
+
+
+def _filas_jsonl(encabezados, filas):
+    codificador = DjangoJSONEncoder(ensure_ascii=False)
+    for fila in filas:
+        yield codificador.encode(dict(zip(encabezados, fila))) + '\n'
+
+
+def _siguiente_bloque(lineas):
+    return ''.join(islice(lineas, TAMANO_CHUNK))
+
+
+async def _lineas_asincronas(lineas):
+    # Cada bloque se lee en el hilo del ORM, el mismo durante toda la
+    # respuesta, como exige el cursor del lado del servidor
+    while bloque := await sync_to_async(_siguiente_bloque)(lineas):
+        yield bloque
+
+
+def respuesta_exportacion(queryset, columnas, formato, nombre, asincrona=False):
+    """
+    Crear una respuesta que exporta el queryset por partes
+    
+    Args:
+        queryset: QuerySet ya filtrado y ordenado
+        columnas: Tuplas (encabezado, campo o lookup para values_list)
+        formato: 'csv' o 'jsonl'
+        nombre: Nombre del archivo sin extensión
+        asincrona: Si la respuesta se sirve bajo ASGI
+    
+    Returns:
+        StreamingHttpResponse: Respuesta con el archivo
+    
+    Raises:
+        ValueError: Si el formato no está soportado
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato no soportado: {formato}. Use csv o jsonl')
+    content_type, extension = FORMATOS[formato]
+    
+    encabezados = [encabezado for encabezado, _ in columnas]
+    filas = queryset.values_list(*[campo for _, campo in columnas]).iterator(chunk_size=TAMANO_CHUNK)
+    generador = _filas_csv if formato == 'csv' else _filas_jsonl
+    lineas = generador(encabezados, filas)
+    if asincrona:
+        lineas = _lineas_asincronas(lineas)
+    
+    respuesta = StreamingHttpResponse(lineas, content_type=content_type)
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.{extension}"'
+    return respuesta
@@ -0,0 +1,134 @@
+"""
+Importación masiva de registros desde CSV o JSON lines
+
+El cuerpo de la petición se lee línea por línea, se valida en lotes y cada
+lote se escribe con un solo INSERT ... ON CONFLICT DO UPDATE dentro de una
+transacción.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
+from rest_framework.serializers import as_serializer_error
+
+TIPOS_CSV = ('text/csv',)
+TIPOS_JSON_LINES = ('application/x-ndjson', 'application/jsonl', 'application/json-lines')
+
+
+def leer_filas(request):
+    """
+    Lee las filas del cuerpo de la petición sin cargarlo completo en memoria
+    
+    Args:
+        request: Request de DRF con Content-Type text/csv o application/x-ndjson
+    
+    Yields:
+        tuple: (número de línea, dict con la fila o None si la línea es inválida)
+    """
+    tipo = request.content_type.split(';')[0].strip().lower()
+    if tipo not in TIPOS_CSV + TIPOS_JSON_LINES:
+        raise UnsupportedMediaType(tipo)
+    if request.stream is None:
+        return
+    
+    lineas = codecs.iterdecode(request.stream, 'utf-8-sig')
+    if tipo in TIPOS_CSV:
+        lector = csv.DictReader(lineas)
+        for fila in lector:
+            yield lector.line_num, fila
+        return
+    
+    for numero, linea in enumerate(lineas, start=1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            fila = None
+        yield numero, fila if isinstance(fila, dict) else None
+
+
+def importar_filas(filas, serializer_class, model, relaciones, unique_fields, update_fields,
+                   al_escribir=None, tamano_lote=1000):
+    """
+    Valida y escribe filas en lotes con bulk_create(update_conflicts=True)
+    
+    Args:
+        filas: Iterable de (número de línea, dict) como el de leer_filas
+        serializer_class: Serializer que valida una fila; las relaciones se
+                          declaran como IntegerField para no consultar fila por fila
+        model: Modelo a escribir
+        relaciones: dict campo -> modelo relacionado, cuya existencia se
+                    verifica con una consulta por lote
+        unique_fields: Campos de la restricción única usada para actualizar
+        update_fields: Campos que se actualizan si la fila ya existe
+        al_escribir: Función opcional llamada con los objetos escritos de cada
+                     lote, dentro de la misma transacción
+        tamano_lote: Filas por lote
+    
+    Returns:
+        dict: Filas procesadas, escritas y errores por fila
+    """
+    reporte = {'procesadas': 0, 'escritas': 0, 'errores': []}
+    filas = iter(filas)
+    # Una sola instancia: construir los campos del serializer por fila domina el tiempo
+    validador = serializer_class()
+    
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        reporte['procesadas'] += len(lote)
+        
+        validas = []
+        for numero, fila in lote:
+            if fila is None:
+                reporte['errores'].append({'fila': numero, 'errores': {'fila': ['Formato inválido']}})
+                continue
+            try:
+                validas.append((numero, validador.run_validation(fila)))
+            except ValidationError as error:
+                reporte['errores'].append({'fila': numero, 'errores': as_serializer_error(error)})
+        
+        # Verificar las relaciones del lote con una consulta por modelo
+        existentes = {
+            campo: set(modelo.objects.filter(pk__in={datos[campo] for _, datos in validas})
+                       .values_list('pk', flat=True))
+            for campo, modelo in relaciones.items()
+        }
+        
+        # Una fila por clave única; si se repite en el lote, gana la última
+        objetos = {}
+        for numero, datos in validas:
+            faltantes = {
+                campo: [f'No existe el registro con ID {datos[campo]}']
+                for campo in relaciones if datos[campo] not in existentes[campo]
+            }
+            if faltantes:
+                reporte['errores'].append({'fila': numero, 'errores': faltantes})
+                continue
+            valores = {
+                (f'{campo}_id' if campo in relaciones else campo): valor
+                for campo, valor in datos.items()
+            }
+            clave = tuple(datos.get(campo) for campo in unique_fields)
+            objetos.pop(clave, None)
+            objetos[clave] = model(**valores)
+        
+        if objetos:
+            with transaction.atomic():
+                escritos = model.objects.bulk_create(
+                    objetos.values(),
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=update_fields,
+                )
+                if al_escribir is not None:
+                    al_escribir(escritos)
+            reporte['escritas'] += len(escritos)
+    
+    reporte['errores'].sort(key=lambda error: error['fila'])
+    return reporte
@@ -1,7 +1,12 @@
 """
 Middleware personalizado para deshabilitar CSRF en las rutas de API REST
+y para mantener la consistencia de las lecturas enviadas a la réplica
 """
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
+from .routers import forzar_primaria
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
 
 
 class DisableCSRFForAPI(MiddlewareMixin):
@@ -16,3 +21,28 @@ class DisableCSRFForAPI(MiddlewareMixin):
             setattr(request, '_dont_enforce_csrf_checks', True)
         return None
 
+
+class LecturaReplicaMiddleware(MiddlewareMixin):
+    """
+    Middleware que garantiza leer las propias escrituras con la réplica activa
+    
+    Tras una escritura exitosa se envía una cookie de corta duración
+    (REPLICA_VENTANA_ESCRITURA segundos); mientras el cliente la tenga, todas
+    sus lecturas van a la base primaria aunque la vista use @lectura_replica.
+    """
+    cookie = 'escritura_reciente'
+    
+    def process_request(self, request):
+        forzar_primaria(self.cookie in request.COOKIES)
+        return None
+    
+    def process_response(self, request, response):
+        forzar_primaria(False)
+        if request.method not in METODOS_SEGUROS and response.status_code < 400:
+            response.set_cookie(
+                self.cookie, '1',
+                max_age=settings.REPLICA_VENTANA_ESCRITURA,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,126 @@
+"""
+Mixins compartidos por los ViewSets de la API
+"""
+import hashlib
+
+from rest_framework import status
+from rest_framework.response import Response
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from .cache import etag_coincide, version_grupo
+
+
+class RepresentacionCompactaMixin:
+    """
+    Agrega el modo compacto (?compacto=true) al listado de un ViewSet
+    
+    En modo compacto cada elemento lleva solo los IDs de sus relaciones y
+    los objetos relacionados se envían una sola vez en diccionarios
+    adicionales de la respuesta (por ejemplo "estudiantes" y "materias"),
+    indexados por ID.
+    
+    Los ViewSets definen:
+        serializer_compacto_class: Serializer de los elementos en modo compacto
+        relaciones_compactas: Tuplas (clave de la respuesta, campo, serializer)
+    """
+    serializer_compacto_class = None
+    relaciones_compactas = ()
+    
+    def es_compacto(self):
+        return self.request.query_params.get('compacto', '').lower() in ('true', '1')
+    
+    def list(self, request, *args, **kwargs):
+        if not self.es_compacto():
+            return super().list(request, *args, **kwargs)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objetos = list(queryset) if page is None else page
+        
+        context = self.get_serializer_context()
+        data = self.serializer_compacto_class(objetos, many=True, context=context).data
+        relacionados = self.serializar_relacionados(objetos, context)
+        
+        if page is None:
+            return Response({'results': data, **relacionados})
+        response = self.get_paginated_response(data)
+        response.data.update(relacionados)
+        return response
+    
+    def serializar_relacionados(self, objetos, context):
+        """Serializa una sola vez cada objeto relacionado de la página"""
+        relacionados = {}
+        for clave, campo, serializer_class in self.relaciones_compactas:
+            unicos = {}
+            for objeto in objetos:
+                relacionado = getattr(objeto, campo)
+                if relacionado is not None:
+                    unicos.setdefault(relacionado.pk, relacionado)
+            relacionados[clave] = {
+                pk: serializer_class(relacionado, context=context).data
+                for pk, relacionado in unicos.items()
+            }
+        return relacionados
+
+
+class GetCondicionalMixin:
+    """
+    Responde 304 Not Modified en list y retrieve si el cliente tiene la versión vigente
+    
+    El ETag del listado no consulta la base de datos: se calcula con la
+    versión en core.cache del grupo de datos del modelo, que cambia con cada
+    escritura (señales y operaciones masivas). El del detalle usa la
+    fecha_actualizacion del objeto. Si coincide con If-None-Match no se
+    serializa nada. Los datos anidados de otros modelos (estudiante, materia,
+    carrera) no cambian la fecha_actualizacion, por lo que el ETag incluye
+    también la versión de sus grupos. Sin CACHE_COMPARTIDA las versiones no
+    son las mismas en todos los procesos y no se usan ETag.
+    
+    Los ViewSets definen:
+        grupo_datos: Grupo de core.cache que se invalida al escribir el modelo
+        grupos_relacionados: Grupos de core.cache de los datos anidados
+    """
+    campo_version = 'fecha_actualizacion'
+    grupo_datos = None
+    grupos_relacionados = ()
+    
+    def calcular_etag(self, *partes):
+        versiones = [version_grupo(grupo) for grupo in self.grupos_relacionados]
+        firma = repr((self.request.get_full_path(), self.request.accepted_media_type, versiones, partes))
+        return f'W/"{hashlib.md5(firma.encode()).hexdigest()}"'
+    
+    def respuesta_condicional(self, etag):
+        """Devuelve la respuesta 304 si el cliente ya tiene el ETag, o None"""
+        if etag_coincide(self.request, etag):
+            return self.agregar_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        return None
+    
+    def agregar_etag(self, response, etag):
+        response['ETag'] = etag
+        # Los clientes pueden guardar la respuesta pero deben revalidarla
+        patch_cache_control(response, no_cache=True)
+        return response
+    
+    def partes_etag_listado(self):
+        """Partes del ETag del listado que dependen de los datos del modelo"""
+        return (version_grupo(self.grupo_datos),)
+    
+    def list(self, request, *args, **kwargs):
+        if not settings.CACHE_COMPARTIDA:
+            return super().list(request, *args, **kwargs)
+        etag = self.calcular_etag(*self.partes_etag_listado())
+        no_modificada = self.respuesta_condicional(etag)
+        if no_modificada is not None:
+            return no_modificada
+        return self.agregar_etag(super().list(request, *args, **kwargs), etag)
+    
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.CACHE_COMPARTIDA:
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        etag = self.calcular_etag(instance.pk, getattr(instance, self.campo_version))
+        no_modificada = self.respuesta_condicional(etag)
+        if no_modificada is not None:
+            return no_modificada
+        serializer = self.get_serializer(instance)
+        return self.agregar_etag(Response(serializer.data), etag)
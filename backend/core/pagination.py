@@ -0,0 +1,155 @@
+"""
+Clases de paginación de la API
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PaginacionKeyset(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre un ordenamiento compuesto
+    
+    El cursor guarda los valores de los campos de ordenamiento de la última
+    (o primera) fila de la página, y la siguiente página se obtiene con un
+    filtro de comparación lexicográfica sobre esos campos. No ejecuta
+    COUNT(*) ni OFFSET, por lo que el costo es el mismo en cualquier página.
+    El último campo del ordenamiento debe ser único (normalmente "id").
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido'
+    
+    def __init__(self, ordenamiento, page_size=None):
+        self.ordenamiento = tuple(ordenamiento)
+        self.page_size = page_size or api_settings.PAGE_SIZE
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = self.decodificar_cursor(request.query_params.get(self.cursor_query_param), queryset.model)
+        
+        hacia_atras = False
+        ordenamiento = self.ordenamiento
+        if cursor is not None:
+            valores, hacia_atras = cursor
+            if hacia_atras:
+                ordenamiento = tuple(self._invertir(campo) for campo in self.ordenamiento)
+            queryset = queryset.filter(self._filtro_posteriores(ordenamiento, valores))
+        
+        resultados = list(queryset.order_by(*ordenamiento)[:self.page_size + 1])
+        hay_mas = len(resultados) > self.page_size
+        resultados = resultados[:self.page_size]
+        
+        if hacia_atras:
+            resultados.reverse()
+            self.hay_anterior, self.hay_siguiente = hay_mas, True
+        else:
+            self.hay_anterior, self.hay_siguiente = cursor is not None, hay_mas
+        
+        self.pagina = resultados
+        return resultados
+    
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+    
+    def get_next_link(self):
+        if not self.hay_siguiente or not self.pagina:
+            return None
+        return self._enlace(self.pagina[-1], hacia_atras=False)
+    
+    def get_previous_link(self):
+        if not self.hay_anterior or not self.pagina:
+            return None
+        return self._enlace(self.pagina[0], hacia_atras=True)
+    
+    def _enlace(self, objeto, hacia_atras):
+        valores = [self._valor_json(getattr(objeto, campo.lstrip('-'))) for campo in self.ordenamiento]
+        cursor = json.dumps({'v': valores, 'a': hacia_atras}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(cursor.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+    
+    def decodificar_cursor(self, cursor, modelo):
+        """
+        Devuelve (valores, hacia_atras) o None si no hay cursor
+        
+        Cada valor se convierte con el to_python de su campo, así un cursor
+        alterado (tipos o cantidad de valores incorrectos) responde 404 en
+        lugar de fallar dentro de la consulta.
+        
+        Args:
+            cursor: Cursor recibido en la URL
+            modelo: Modelo del queryset paginado
+        """
+        if not cursor:
+            return None
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            valores, hacia_atras = datos['v'], bool(datos['a'])
+            if not isinstance(valores, list) or len(valores) != len(self.ordenamiento) or None in valores:
+                raise ValueError(self.invalid_cursor_message)
+            valores = [
+                modelo._meta.get_field(campo.lstrip('-')).to_python(valor)
+                for campo, valor in zip(self.ordenamiento, valores)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return valores, hacia_atras
+    
+    @staticmethod
+    def _valor_json(valor):
+        # Fechas en ISO 8601 completo (con microsegundos) para no perder precisión
+        return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+    
+    @staticmethod
+    def _invertir(campo):
+        return campo[1:] if campo.startswith('-') else f'-{campo}'
+    
+    @staticmethod
+    def _filtro_posteriores(ordenamiento, valores):
+        """
+        Filtro de las filas que van después de `valores` según `ordenamiento`:
+        (a > va) OR (a = va AND b > vb) OR ..., usando < en campos descendentes
+        """
+        filtro = Q()
+        iguales = Q()
+        for campo, valor in zip(ordenamiento, valores):
+            nombre = campo.lstrip('-')
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= iguales & Q(**{f'{nombre}__{operador}': valor})
+            iguales &= Q(**{nombre: valor})
+        return filtro
+
+
+class PaginacionEstandar(PageNumberPagination):
+    """
+    Paginación por número de página, con paginación por cursor opcional
+    
+    Los ViewSets que definen `ordenamiento_cursor` admiten además
+    ?paginacion=cursor (o ?cursor=...), que usa PaginacionKeyset y omite
+    el conteo total de resultados.
+    """
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        ordenamiento = getattr(view, 'ordenamiento_cursor', None)
+        self.keyset = None
+        if ordenamiento and (request.query_params.get('paginacion') == 'cursor'
+                             or PaginacionKeyset.cursor_query_param in request.query_params):
+            self.keyset = PaginacionKeyset(ordenamiento, self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
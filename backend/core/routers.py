@@ -0,0 +1,90 @@
+"""
+Enrutamiento de lecturas a la réplica de la base de datos
+
+Las escrituras van siempre a 'default'. Las lecturas solo van a la réplica
+dentro de las vistas marcadas con @lectura_replica, y nunca durante la
+ventana posterior a una escritura del mismo cliente (ver
+core.middleware.LecturaReplicaMiddleware), para que el usuario vea sus
+propios cambios aunque la réplica tenga retraso.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+ALIAS_REPLICA = 'replica'
+
+_usar_replica = ContextVar('usar_replica', default=False)
+_forzar_primaria = ContextVar('forzar_primaria', default=False)
+
+
+def forzar_primaria(valor):
+    """Fijar si las lecturas de la petición actual deben ir a la base primaria"""
+    _forzar_primaria.set(valor)
+
+
+@contextmanager
+def lecturas_primaria():
+    """
+    Envía a la base primaria las lecturas del bloque, aunque la vista use @lectura_replica
+    
+    Para construir datos que se guardan en cachés compartidas: si se
+    construyeran desde una réplica con retraso quedarían guardados bajo la
+    versión nueva con datos anteriores al cambio.
+    """
+    token = _forzar_primaria.set(True)
+    try:
+        yield
+    finally:
+        _forzar_primaria.reset(token)
+
+
+def lectura_replica(funcion):
+    """
+    Decorador que envía a la réplica las lecturas de una vista de solo lectura
+    
+    Funciona en vistas síncronas y asíncronas y en acciones de ViewSets. Si
+    no hay réplica configurada, las lecturas siguen yendo a 'default'.
+    """
+    if iscoroutinefunction(funcion):
+        # Las consultas asíncronas del ORM se ejecutan con una copia del
+        # contexto, así que ven el valor fijado aquí
+        @wraps(funcion)
+        async def envoltura_async(*args, **kwargs):
+            token = _usar_replica.set(True)
+            try:
+                return await funcion(*args, **kwargs)
+            finally:
+                _usar_replica.reset(token)
+        return envoltura_async
+    
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        token = _usar_replica.set(True)
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            _usar_replica.reset(token)
+    return envoltura
+
+
+class ReplicaRouter:
+    """Router que dirige las lecturas de las vistas marcadas a la réplica"""
+    
+    def db_for_read(self, model, **hints):
+        if _usar_replica.get() and not _forzar_primaria.get() and ALIAS_REPLICA in settings.DATABASES:
+            return ALIAS_REPLICA
+        return None
+    
+    def db_for_write(self, model, **hints):
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica tiene los mismos datos que la primaria
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación
+        return db != ALIAS_REPLICA
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import copy
 from pathlib import Path
 from decouple import config
 
@@ -58,6 +59,7 @@ MIDDLEWARE = [
     'core.middleware.DisableCSRFForAPI',  # Deshabilitar CSRF para API antes del middleware CSRF
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.LecturaReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,6 +88,14 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 # Configuración de PostgreSQL - Todas las variables desde archivo .env
 # IMPORTANTE: Todas las variables deben estar definidas en el archivo .env
+# Reutilización de conexiones:
+# - DB_CONN_MAX_AGE: segundos que una conexión persiste entre peticiones (0 = una por petición).
+#   Solo para WSGI: bajo ASGI cada hilo del executor guarda su propia conexión y
+#   pueden agotar max_connections; ahí se deja en 0 o se usa DB_POOL
+# - DB_POOL: pool nativo de psycopg 3 (requiere instalar psycopg[pool]); reemplaza a
+#   las conexiones persistentes, por lo que CONN_MAX_AGE queda en 0
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -94,11 +104,64 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DATABASE_HOST'),
         'PORT': config('DATABASE_PORT'),
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
         'OPTIONS': {
             'connect_timeout': 10,
         },
+    }
 }
+
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+
+# Réplica de solo lectura (opcional): las vistas marcadas con
+# core.routers.lectura_replica leen de ella; las escrituras van a 'default'
+DATABASE_REPLICA_HOST = config('DATABASE_REPLICA_HOST', default='')
+if DATABASE_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': DATABASE_REPLICA_HOST,
+        'PORT': config('DATABASE_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Segundos durante los que un cliente lee de la primaria después de escribir
+REPLICA_VENTANA_ESCRITURA = config('DB_REPLICA_VENTANA_ESCRITURA', default=5, cast=int)
+
+
+# Caché
+# CACHE_BACKEND: locmem (por proceso), file o redis (requiere el paquete redis).
+# Con varios procesos use file o redis para que la invalidación sea compartida.
+BACKENDS_CACHE = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'ruta-academica'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
 }
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': BACKENDS_CACHE[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=BACKENDS_CACHE[CACHE_BACKEND][1]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'ruta-academica',
+    }
+}
+
+# Indica si todos los procesos ven la misma caché. Las respuestas en caché y
+# los ETag dependen de versiones de grupo guardadas en ella (ver core.cache);
+# con locmem una escritura solo cambia la versión del proceso que la atiende
+# y los demás seguirían respondiendo 304 y sirviendo datos viejos sin límite,
+# por eso con locmem quedan desactivados salvo que se indique que hay un
+# único proceso (por ejemplo, runserver) con CACHE_COMPARTIDA=True.
+CACHE_COMPARTIDA = config('CACHE_COMPARTIDA', default=CACHE_BACKEND != 'locmem', cast=bool)
 
 
 # Password validation
@@ -159,12 +222,41 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.AutenticacionTokenCache',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.PaginacionEstandar',
     'PAGE_SIZE': 20,
 }
 
+# Días que las alertas vencidas o inactivas permanecen en la tabla de
+# alertas antes de que archivar_alertas las mueva a AlertaArchivada
+ALERTAS_DIAS_RETENCION = config('ALERTAS_DIAS_RETENCION', default=30, cast=int)
+
+# Segundos máximos que se guarda en caché el contador de alertas de un estudiante
+ALERTAS_CONTADOR_SEGUNDOS = config('ALERTAS_CONTADOR_SEGUNDOS', default=300, cast=int)
+
+# Eventos para los streams Server-Sent Events (ver core.eventos)
+# local: en memoria del proceso; redis: compartido entre procesos
+EVENTOS_BACKEND = config('EVENTOS_BACKEND', default='local')
+# Procesos del servidor (uvicorn y gunicorn leen WEB_CONCURRENCY). Con más de
+# uno, el backend local no entrega los eventos publicados en otros procesos
+# y el stream de alertas responde 501 hasta configurar EVENTOS_BACKEND=redis
+SERVIDOR_WORKERS = config('WEB_CONCURRENCY', default=1, cast=int)
+EVENTOS_REDIS_URL = config('EVENTOS_REDIS_URL', default='redis://127.0.0.1:6379/2')
+# Eventos pendientes por cliente antes de descartarlos y pedirle que se resincronice
+EVENTOS_TAMANO_COLA = config('EVENTOS_TAMANO_COLA', default=100, cast=int)
+# Segundos sin eventos tras los que se envía un comentario para mantener la conexión
+EVENTOS_KEEPALIVE_SEGUNDOS = config('EVENTOS_KEEPALIVE_SEGUNDOS', default=15, cast=int)
+
+# Autenticación por token
+# Segundos que se guarda en caché la relación token -> usuario (0 = sin caché).
+# Con locmem cada proceso tiene su propia caché y el logout solo la limpia en
+# el proceso que lo atiende: los demás aceptarían el token hasta que expire su
+# entrada, por eso el valor por defecto solo activa la caché con file o redis.
+TOKEN_CACHE_SEGUNDOS = config('TOKEN_CACHE_SEGUNDOS', default=0 if CACHE_BACKEND == 'locmem' else 60, cast=int)
+# Horas de validez de un token desde su creación (0 = no expira)
+TOKEN_EXPIRACION_HORAS = config('TOKEN_EXPIRACION_HORAS', default=0, cast=int)
+
 # CORS settings (para desarrollo)
 # Nota: Si necesitas CORS, instala django-cors-headers y descomenta las líneas siguientes
 # CORS_ALLOWED_ORIGINS = [
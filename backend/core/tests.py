@@ -0,0 +1,210 @@
+import base64
+import json
+import random
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.alertas.models import Alerta, TipoAlerta
+from apps.asistencias.models import Asistencia
+from apps.estudiantes.models import Carrera, Estudiante
+from apps.materias.models import Materia
+from apps.notas.models import Nota
+from core.pagination import PaginacionEstandar
+
+
+def _nodos_plan(plan):
+    yield plan
+    for subplan in plan.get('Plans', ()):
+        yield from _nodos_plan(subplan)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN de PostgreSQL')
+class IndicesConsultasTests(TestCase):
+    """
+    Las consultas de la API usan los índices definidos para ellas
+    
+    Se comprueba el nombre del índice en el plan y no solo que no haya Seq
+    Scan: las claves foráneas y restricciones únicas ya tienen índices que
+    evitarían el Seq Scan aunque faltaran los de Meta.indexes. Con
+    enable_seqscan desactivado el resultado no depende del tamaño de los
+    datos de prueba.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        # Pocos estudiantes con muchas filas cada uno, insertadas en desorden: así
+        # el índice de la clave foránea estudiante_id no es selectivo ni sigue el
+        # orden físico de la tabla, y el planificador solo elige el compuesto si existe
+        materias = Materia.objects.bulk_create([
+            Materia(codigo=f'MAT{i}', nombre=f'Materia {i}', creditos=3) for i in range(8)
+        ])
+        usuarios = User.objects.bulk_create([User(username=f'estudiante{i}') for i in range(10)])
+        estudiantes = Estudiante.objects.bulk_create([
+            Estudiante(user=usuario, codigo=f'E{i:03}', carrera=carrera) for i, usuario in enumerate(usuarios)
+        ])
+        ahora = timezone.now()
+        Nota.objects.bulk_create([
+            Nota(estudiante=estudiante, materia=materia, valor=15, porcentaje=50, descripcion=f'Parcial {i}')
+            for estudiante in estudiantes for materia in materias for i in range(2)
+        ])
+        asistencias = [
+            Asistencia(estudiante=estudiante, materia=materia, fecha=date(2025, 3, 1) + timedelta(days=i),
+                       asistio=i % 10 != 0)
+            for estudiante in estudiantes for materia in materias for i in range(60)
+        ]
+        random.Random(0).shuffle(asistencias)
+        Asistencia.objects.bulk_create(asistencias)
+        alertas = [
+            Alerta(estudiante=estudiante, materia=materia, tipo=TipoAlerta.WARNING, titulo='Alerta', mensaje='Mensaje',
+                   activa=i % 10 == 0, leida=i % 20 != 0,
+                   fecha_vencimiento=ahora - timedelta(days=1) if i == 0 else None)
+            for estudiante in estudiantes for materia in materias for i in range(40)
+        ]
+        random.Random(0).shuffle(alertas)
+        Alerta.objects.bulk_create(alertas)
+        cls.estudiante = estudiantes[0]
+        cls.materia = materias[0]
+        with connection.cursor() as cursor:
+            for modelo in (Nota, Asistencia, Alerta):
+                cursor.execute(f'ANALYZE {modelo._meta.db_table}')
+    
+    def assertUsaIndice(self, queryset, indice):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        # Según el driver, EXPLAIN (FORMAT JSON) llega como lista o como su único elemento
+        salida = json.loads(queryset.explain(format='json'))
+        plan = (salida[0] if isinstance(salida, list) else salida)['Plan']
+        indices = {nodo['Index Name'] for nodo in _nodos_plan(plan) if 'Index Name' in nodo}
+        self.assertIn(indice, indices, f'El plan no usa {indice}:\n{json.dumps(plan, indent=2)}')
+    
+    def test_estadisticas_asistencia(self):
+        self.assertUsaIndice(Asistencia.objects.filter(estudiante=self.estudiante, materia=self.materia, asistio=False),
+                             'asist_est_mat_asistio_idx')
+        self.assertUsaIndice(Asistencia.objects.filter(materia=self.materia, asistio=False), 'asist_mat_asistio_idx')
+    
+    def test_alertas_de_estudiante(self):
+        self.assertUsaIndice(
+            Alerta.objects.filter(estudiante=self.estudiante, activa=True, leida=False).order_by('-fecha_creacion'),
+            'alerta_no_leidas_idx',
+        )
+        self.assertUsaIndice(
+            Alerta.objects.filter(estudiante=self.estudiante, activa=True, leida=True).order_by('-fecha_creacion'),
+            'alerta_est_act_leida_idx',
+        )
+    
+    def test_alertas_vencidas(self):
+        self.assertUsaIndice(Alerta.objects.filter(fecha_vencimiento__lt=timezone.now()), 'alerta_vencimiento_idx')
+    
+    def test_paginacion_por_cursor(self):
+        self.assertUsaIndice(Nota.objects.order_by('-fecha', 'materia_id', 'id')[:20], 'nota_fecha_mat_id_idx')
+        self.assertUsaIndice(Asistencia.objects.order_by('-fecha', 'materia_id', 'id')[:20], 'asist_fecha_mat_id_idx')
+        self.assertUsaIndice(Alerta.objects.order_by('-fecha_creacion', 'id')[:20], 'alerta_fecha_id_idx')
+
+
+class AutenticacionTokenCacheTests(APITestCase):
+    """Un token eliminado en otro proceso deja de valer según TOKEN_CACHE_SEGUNDOS"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.token = Token.objects.create(user=User.objects.create_user(username='usuario'))
+    
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
+    def cerrar_sesion_en_otro_proceso(self):
+        # Con locmem, el proceso que atiende el logout no limpia la caché de este
+        with mock.patch('apps.estudiantes.signals.invalidar_token'):
+            Token.objects.filter(key=self.token.key).delete()
+    
+    @override_settings(TOKEN_CACHE_SEGUNDOS=0)
+    def test_sin_cache_el_logout_es_inmediato(self):
+        self.assertEqual(self.client.get('/api/auth/perfil/').status_code, 404)
+        self.cerrar_sesion_en_otro_proceso()
+        # SessionAuthentication va primero y no define WWW-Authenticate: 403 en vez de 401
+        self.assertEqual(self.client.get('/api/auth/perfil/').status_code, 403)
+    
+    @override_settings(TOKEN_CACHE_SEGUNDOS=60)
+    def test_con_cache_el_token_vale_hasta_que_expira(self):
+        self.assertEqual(self.client.get('/api/auth/perfil/').status_code, 404)
+        self.cerrar_sesion_en_otro_proceso()
+        self.assertEqual(self.client.get('/api/auth/perfil/').status_code, 404)
+
+
+class PaginacionKeysetTests(APITestCase):
+    """La paginación por cursor recorre el listado y rechaza cursores alterados"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        carrera = Carrera.objects.create(nombre='Carrera de prueba')
+        materia = Materia.objects.create(codigo='MAT0', nombre='Materia 0', creditos=3)
+        estudiante = Estudiante.objects.create(user=User.objects.create_user(username='estudiante'),
+                                               codigo='E000', carrera=carrera)
+        for i in range(5):
+            Nota.objects.create(estudiante=estudiante, materia=materia, valor=15, porcentaje=10,
+                                descripcion=f'Taller {i}')
+    
+    def cursor(self, datos):
+        return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode()
+    
+    def test_recorre_todas_las_paginas(self):
+        ids = []
+        paginas = 0
+        url = '/api/notas/?paginacion=cursor'
+        with mock.patch.object(PaginacionEstandar, 'page_size', 2):
+            while url:
+                respuesta = self.client.get(url)
+                self.assertEqual(respuesta.status_code, 200)
+                ids += [nota['id'] for nota in respuesta.data['results']]
+                url = respuesta.data['next']
+                paginas += 1
+        self.assertEqual(paginas, 3)
+        self.assertCountEqual(ids, Nota.objects.values_list('id', flat=True))
+    
+    def test_cursor_alterado(self):
+        nota = Nota.objects.order_by('id').first()
+        validos = [nota.fecha.isoformat(), nota.materia_id, nota.id]
+        for cursor in ['no-es-base64!', self.cursor([1, 2]), self.cursor({'v': validos[:2], 'a': False}),
+                       self.cursor({'v': ['ayer', nota.materia_id, nota.id], 'a': False}),
+                       self.cursor({'v': [validos[0], 'x', nota.id], 'a': False}),
+                       self.cursor({'v': [validos[0], nota.materia_id, [1]], 'a': False}),
+                       self.cursor({'v': [validos[0], nota.materia_id, None], 'a': True})]:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get('/api/notas/', {'cursor': cursor}).status_code, 404)
+        
+        respuesta = self.client.get('/api/notas/', {'cursor': self.cursor({'v': validos, 'a': False})})
+        self.assertEqual(respuesta.status_code, 200)
+
+
+class CacheRespuestasTests(APITestCase):
+    """Las respuestas en caché y sus ETag requieren una caché compartida"""
+    
+    def setUp(self):
+        cache.clear()
+        Carrera.objects.create(nombre='Carrera de prueba')
+    
+    @override_settings(CACHE_COMPARTIDA=True)
+    def test_con_cache_compartida(self):
+        etag = self.client.get('/api/carreras/')['ETag']
+        self.assertEqual(self.client.get('/api/carreras/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(0):
+            self.client.get('/api/carreras/')
+    
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_sin_cache_compartida(self):
+        respuesta = self.client.get('/api/carreras/')
+        total = len(respuesta.data['results'])
+        self.assertNotIn('ETag', respuesta)
+        self.assertEqual(self.client.get('/api/carreras/', HTTP_IF_NONE_MATCH='*').status_code, 200)
+        # Un cambio hecho por otro proceso, sin invalidar la caché de este
+        with mock.patch('apps.estudiantes.signals.invalidar_grupo'):
+            Carrera.objects.create(nombre='Otra carrera')
+        self.assertEqual(len(self.client.get('/api/carreras/').data['results']), total + 1)
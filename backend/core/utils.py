@@ -0,0 +1,33 @@
+"""
+Utilidades compartidas por las aplicaciones
+"""
+
+
+def parsear_ids(valor):
+    """
+    Convierte un parámetro del tipo "1,2,3" (o una lista JSON) en una lista de IDs enteros
+    
+    Args:
+        valor: Cadena con IDs separados por comas, o lista de IDs
+    
+    Returns:
+        list: IDs sin duplicados y en el orden recibido
+    
+    Raises:
+        ValueError: Si algún elemento no es un entero
+    """
+    if isinstance(valor, str):
+        partes = [parte.strip() for parte in valor.split(',')]
+    elif isinstance(valor, (list, tuple)):
+        partes = valor
+    else:
+        raise ValueError(f'IDs inválidos: {valor!r}')
+    
+    ids = []
+    for parte in partes:
+        if parte == '':
+            continue
+        if isinstance(parte, bool) or not isinstance(parte, (int, str)):
+            raise ValueError(f'ID inválido: {parte!r}')
+        ids.append(int(parte))
+    return list(dict.fromkeys(ids))
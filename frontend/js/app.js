@@ -25,6 +25,7 @@ function saveToken(token) {
 
 // Función para eliminar el token
 function removeToken() {
+    desconectarStreamAlertas();
     localStorage.removeItem('auth_token');
     estadoApp.token = null;
     estadoApp.user = null;
@@ -180,9 +181,77 @@ async function cargarDatos() {
     
     estadoApp.notas = [];
     estadoApp.asistencias = [];
-    estadoApp.alertas = [];
+    estadoApp.alertas = await obtenerAlertas();
 
     actualizarUI();
+    conectarStreamAlertas();
+}
+
+// Cargar las alertas activas del estudiante
+async function obtenerAlertas() {
+    if (!estadoApp.estudiante) return [];
+    try {
+        const data = await apiRequest(`/alertas/?estudiante=${estadoApp.estudiante.id}&activa=true`);
+        return data.results || data || [];
+    } catch (error) {
+        console.error('Error al cargar alertas:', error);
+        return [];
+    }
+}
+
+// Alertas nuevas en tiempo real con Server-Sent Events. Si el servidor no
+// ofrece el stream (por ejemplo, responde 501 bajo WSGI) se consultan las
+// alertas periódicamente
+const INTERVALO_SONDEO_ALERTAS_MS = 60000;
+let streamAlertas = null;
+let sondeoAlertas = null;
+
+function conectarStreamAlertas() {
+    desconectarStreamAlertas();
+    if (!estadoApp.estudiante) return;
+    if (!window.EventSource) {
+        iniciarSondeoAlertas();
+        return;
+    }
+
+    const stream = new EventSource(`${API_BASE_URL}/alertas/stream/?estudiante=${estadoApp.estudiante.id}`);
+    stream.addEventListener('alerta', (e) => {
+        const alerta = JSON.parse(e.data);
+        if (!estadoApp.alertas.some(existente => existente.id === alerta.id)) {
+            estadoApp.alertas.unshift(alerta);
+            actualizarAlertas();
+            actualizarDashboard();
+        }
+    });
+    stream.onerror = () => {
+        // El navegador reintenta solo los cortes de conexión; si el servidor
+        // rechazó el stream, queda cerrado
+        if (stream.readyState === EventSource.CLOSED && streamAlertas === stream) {
+            streamAlertas = null;
+            iniciarSondeoAlertas();
+        }
+    };
+    streamAlertas = stream;
+}
+
+function iniciarSondeoAlertas() {
+    if (sondeoAlertas) return;
+    sondeoAlertas = setInterval(async () => {
+        estadoApp.alertas = await obtenerAlertas();
+        actualizarAlertas();
+        actualizarDashboard();
+    }, INTERVALO_SONDEO_ALERTAS_MS);
+}
+
+function desconectarStreamAlertas() {
+    if (streamAlertas) {
+        streamAlertas.close();
+        streamAlertas = null;
+    }
+    if (sondeoAlertas) {
+        clearInterval(sondeoAlertas);
+        sondeoAlertas = null;
+    }
 }
 
 // Actualizar la interfaz de usuario